@@ -0,0 +1,112 @@
+"""Columnar story batch for trimming very large inputs (optional, needs NumPy).
+
+The records stay in a list, and the two fields trimming reads become parallel
+arrays:
+
+- ``ts``      publish time, epoch seconds (``_MISSING`` when unknown)
+- ``hint``    section-hint code (index into ``hints``)
+
+The recency filter, newest-first order and per-hint round-robin are array
+operations that return index arrays. Records are only looked up again at the
+model boundary (``records``). Without NumPy, ``available()`` is False and
+callers keep their loops.
+
+``curate._trim_input`` switches to this only from ``config.BATCH_MIN_STORIES``
+stories (a million by default). ``python -m src.bench batch`` shows why: the
+array operations are several times faster than the loops, but building the
+columns from Story records costs about as much as the loops themselves. So at
+everyday sizes this is exercised by the bench alone. Exact-duplicate removal
+stays in normalize's hash index. A columnar version needed a canonical-URL
+key column, which cost more to build than the loop it replaced.
+"""
+
+from __future__ import annotations
+
+from .story import Story
+
+try:
+    import numpy as np
+except ImportError:  # optional: only large batches need it
+    np = None
+
+_MISSING = -(2**62)
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _codes(values: list[str]) -> tuple[list[str], "np.ndarray"]:
+    """(distinct values in first-seen order, per-item code array)."""
+    table: dict[str, int] = {}
+    codes = np.array([table.setdefault(v, len(table)) for v in values], dtype=np.int32)
+    return list(table), codes
+
+
+class StoryBatch:
+    """Column arrays over ``stories``, each built on first use (one pass over
+    the records)."""
+
+    def __init__(self, stories: list[Story]):
+        self.stories = stories
+        self._cols: dict[str, "np.ndarray"] = {}
+
+    def _col(self, name: str, build) -> "np.ndarray":
+        col = self._cols.get(name)
+        if col is None:
+            col = self._cols[name] = build()
+        return col
+
+    @property
+    def ts(self) -> "np.ndarray":
+        return self._col("ts", lambda: np.array(
+            [_MISSING if s.pub_ts is None else s.pub_ts for s in self.stories], dtype=np.int64
+        ))
+
+    @property
+    def hint(self) -> "np.ndarray":
+        if "hint" not in self._cols:
+            self.hints, self._cols["hint"] = _codes([s.section_hint for s in self.stories])
+        return self._cols["hint"]
+
+    def __len__(self) -> int:
+        return len(self.stories)
+
+    def recent(self, cutoff: float, idx: "np.ndarray") -> "np.ndarray":
+        """``idx`` minus stories published before ``cutoff`` (undated ones stay)."""
+        ts = self.ts[idx]
+        return idx[(ts >= cutoff) | (ts == _MISSING)]
+
+    def newest_first(self, idx: "np.ndarray") -> "np.ndarray":
+        """``idx`` ordered newest first, undated last, ties in input order."""
+        ts = self.ts[idx]
+        order = np.where(ts == _MISSING, np.iinfo(np.int64).max, -ts)
+        return idx[np.argsort(order, kind="stable")]
+
+    def round_robin(self, idx: "np.ndarray", total: int) -> "np.ndarray":
+        """Up to ``total`` of ``idx``, one per hint per round.
+
+        Hints take turns in the order they first appear in ``idx``, and each
+        hint's stories keep their order in ``idx``.
+        """
+        if not len(idx):
+            return idx
+        hint = self.hint[idx]
+        # Rank of each story within its hint: position minus its group's start.
+        by_hint = np.argsort(hint, kind="stable")
+        sorted_hint = hint[by_hint]
+        starts = np.flatnonzero(np.r_[True, sorted_hint[1:] != sorted_hint[:-1]])
+        sizes = np.diff(np.r_[starts, len(idx)])
+        rank = np.empty(len(idx), dtype=np.int64)
+        rank[by_hint] = np.arange(len(idx)) - np.repeat(starts, sizes)
+        # Turn order: when each hint first appears.
+        first = np.full(int(self.hint.max()) + 1, len(idx), dtype=np.int64)
+        np.minimum.at(first, hint, np.arange(len(idx)))
+        turn = np.argsort(np.argsort(first, kind="stable"), kind="stable")[hint]
+        return idx[np.lexsort((turn, rank))[:total]]
+
+    def records(self, idx: "np.ndarray") -> list[Story]:
+        return [self.stories[i] for i in idx.tolist()]
+
+    def all(self) -> "np.ndarray":
+        return np.arange(len(self.stories))
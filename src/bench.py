@@ -0,0 +1,329 @@
+"""Micro-benchmarks over recorded and synthetic payloads.
+
+Payload subcommands read a cassette recorded with ``--record`` (see
+src.cassette), so timings run on real responses and repeat exactly:
+
+    python -m src.bench rss CASSETTE      # src.rss vs feedparser on every recorded feed
+    python -m src.bench clean CASSETTE    # normalize._clean vs the three-pass cleaner
+    python -m src.bench stories           # Story records vs dicts at 10k and 100k stories
+    python -m src.bench batch             # curate trimming: loops vs NumPy columns (src.batch)
+    python -m src.bench cluster           # near-duplicate clustering: MinHash/LSH vs all pairs
+
+Timings are the best of ``--repeat`` runs, in milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import html
+import json
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from . import cassette
+
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _recorded_feeds(path: Path) -> list[tuple[str, bytes]]:
+    """(url, body) for every successful recorded exchange that looks like XML."""
+    feeds = []
+    for ex in cassette.load(path).get("exchanges", []):
+        body = cassette.body(ex)
+        if ex["status"] == 200 and body.lstrip()[:1] == b"<":
+            feeds.append((ex["url"], body))
+    return feeds
+
+
+# Fields normalize cleans, across the Guardian, NYT, Perigon and RSS payloads.
+_TEXT_KEYS = {"webTitle", "trailText", "title", "abstract", "description", "summary"}
+
+
+def _walk_texts(node, out: list[str]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in _TEXT_KEYS and isinstance(value, str):
+                out.append(value)
+            else:
+                _walk_texts(value, out)
+    elif isinstance(node, list):
+        for value in node:
+            _walk_texts(value, out)
+
+
+def _recorded_texts(path: Path) -> list[str]:
+    """Every title/description string in the cassette's JSON and feed bodies."""
+    import feedparser
+
+    from . import rss
+
+    texts: list[str] = []
+    for ex in cassette.load(path).get("exchanges", []):
+        body = cassette.body(ex)
+        if ex["status"] != 200:
+            continue
+        if body.lstrip()[:1] == b"<":
+            entries = rss.parse(body) or feedparser.parse(body).entries
+            _walk_texts([dict(e) for e in entries], texts)
+        else:
+            try:
+                _walk_texts(json.loads(body), texts)
+            except ValueError:
+                continue
+    return texts
+
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def _clean_reference(text: str | None) -> str:
+    """The original three-pass cleaner: strip tags, unescape, collapse whitespace."""
+    if not text:
+        return ""
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def bench_clean(args: argparse.Namespace) -> None:
+    from .normalize import _clean
+
+    texts = _recorded_texts(args.cassette)
+    if not texts:
+        raise SystemExit(f"no titles or descriptions recorded in {args.cassette}")
+    unlimited = float("inf")
+    mismatches = [t for t in texts if _clean(t, unlimited) != _clean_reference(t)]
+    capped = sum(len(_clean_reference(t)) > len(_clean(t)) for t in texts)
+    marked = sum("<" in t or "&" in t for t in texts)
+    ref_ms = _best_ms(lambda: [_clean_reference(t) for t in texts], args.repeat)
+    new_ms = _best_ms(lambda: [_clean(t) for t in texts], args.repeat)
+    print(f"{len(texts)} strings ({marked} with markup, {sum(map(len, texts)) / 1024:.0f}KB)")
+    print(f"three-pass {ref_ms:8.2f} ms")
+    print(f"_clean     {new_ms:8.2f} ms  ({ref_ms / new_ms:.1f}x)")
+    print(f"identical without the cap: {len(texts) - len(mismatches)}/{len(texts)}; "
+          f"cut by CLEAN_MAX_CHARS: {capped}")
+    for text in mismatches[:5]:
+        print(f"  MISMATCH {text[:80]!r}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def bench_rss(args: argparse.Namespace) -> None:
+    import feedparser
+
+    from . import rss
+    from .normalize import normalize
+
+    def stories(entries) -> list:
+        for e in entries:
+            e["_src"] = "rss"
+        return normalize(entries)
+
+    feeds = _recorded_feeds(args.cassette)
+    if not feeds:
+        raise SystemExit(f"no XML feeds recorded in {args.cassette}")
+
+    print(f"{'feed':<48} {'KB':>6} {'items':>5} {'fast ms':>8} {'feedparser ms':>13} {'speedup':>7}  match")
+    total_fast = total_slow = 0.0
+    for url, body in feeds:
+        fast = rss.parse(body)
+        slow = feedparser.parse(body).entries
+        slow_ms = _best_ms(lambda: feedparser.parse(body), args.repeat)
+        # A feed src.rss rejects costs the failed attempt plus feedparser.
+        fast_ms = _best_ms(lambda: rss.parse(body), args.repeat)
+        if fast is None:
+            fast_ms += slow_ms
+        total_fast += fast_ms
+        total_slow += slow_ms
+        if fast is None:
+            match = "fallback"
+        else:
+            a, b = stories(fast), stories(slow)
+            same = sum(x == y for x, y in zip(a, b))
+            match = f"{same}/{max(len(a), len(b))}"
+        print(
+            f"{url[:48]:<48} {len(body) / 1024:>6.0f} {len(slow):>5} {fast_ms:>8.2f} "
+            f"{slow_ms:>13.2f} {slow_ms / fast_ms:>6.1f}x  {match}"
+        )
+    print(f"{'total':<48} {'':>6} {'':>5} {total_fast:>8.2f} {total_slow:>13.2f} {total_slow / total_fast:>6.1f}x")
+
+
+def _story_rows(n: int) -> list[dict]:
+    """``n`` synthetic normalized-story dicts, decoded from JSON so every
+    string is its own object, as it is coming off the wire."""
+    sources = ["The Guardian", "The New York Times", "CBC Toronto", "ft.com", "reuters.com"]
+    hints = ["world", "business", "sports", "opinion", "toronto"]
+    rows = [
+        {
+            "title": f"Story number {i} about something newsworthy",
+            "description": f"A two-sentence trail for story {i}. " * 3,
+            "source": sources[i % len(sources)],
+            "section_hint": hints[i % len(hints)],
+            "pub_date": f"2026-10-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+            "image": f"https://img.example.com/{i}.jpg" if i % 3 else None,
+            "link": f"https://news.example.com/{hints[i % len(hints)]}/{i}",
+        }
+        for i in range(n)
+    ]
+    return json.loads(json.dumps(rows))
+
+
+def _retained_kb(build: Callable[[list[dict]], list], n: int) -> float:
+    """KB still allocated by ``build``'s output once its input rows are freed."""
+    rows = _story_rows(n)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    out = build(rows)
+    del rows
+    gc.collect()
+    kept = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del out
+    return kept / 1024
+
+
+def bench_stories(args: argparse.Namespace) -> None:
+    from .story import Story, epoch
+
+    def as_dicts(rows: list[dict]) -> list[dict]:
+        return [dict(r) for r in rows]
+
+    def as_stories(rows: list[dict]) -> list[Story]:
+        return [
+            Story(r["title"], r["description"], r["source"], r["section_hint"],
+                  epoch(r["pub_date"]), r["image"], r["link"])
+            for r in rows
+        ]
+
+    repeat = max(1, args.repeat // 4)
+    print(f"{'stories':>8} {'kind':<6} {'KB kept':>9} {'B/story':>8} {'build ms':>9} {'json ms':>8}")
+    for n in args.sizes:
+        rows = _story_rows(n)
+        for kind, build, encode in (
+            ("dict", as_dicts, lambda out: json.dumps(out)),
+            ("Story", as_stories, lambda out: json.dumps([s.to_dict() for s in out])),
+        ):
+            kb = _retained_kb(build, n)
+            build_ms = _best_ms(lambda: build(rows), repeat)
+            out = build(rows)
+            json_ms = _best_ms(lambda out=out: encode(out), repeat)
+            print(f"{n:>8} {kind:<6} {kb:>9.0f} {kb * 1024 / n:>8.0f} {build_ms:>9.1f} {json_ms:>8.1f}")
+            del out
+
+
+def bench_batch(args: argparse.Namespace) -> None:
+    from . import batch, config
+    from .curate import _trim_loop
+    from .story import Story, epoch
+
+    if not batch.available():
+        raise SystemExit("NumPy is not installed")
+
+    repeat = max(1, args.repeat // 4)
+    print(f"{'stories':>8} {'loop ms':>9} {'numpy ms':>9} {'ops only':>9}  same")
+    for n in args.sizes:
+        stories = [
+            Story(r["title"], r["description"], r["source"], r["section_hint"], epoch(r["pub_date"]),
+                  r["image"], r["link"])
+            for r in _story_rows(n)
+        ]
+        newest = max(s.pub_ts for s in stories)
+        cutoff = newest - config.CURATE_MAX_AGE_HOURS * 3600 * 4
+        # "numpy ms" builds the columns from the records each time, as
+        # _trim_input does; "ops only" reuses columns built once.
+        built = batch.StoryBatch(stories)
+        built.ts, built.hint
+
+        def trim(cols: batch.StoryBatch) -> list[Story]:
+            idx = cols.recent(cutoff, cols.all())
+            return cols.records(cols.round_robin(cols.newest_first(idx), config.CURATE_MAX_INPUT))
+
+        def loop() -> list[Story]:
+            return _trim_loop(stories, config.CURATE_MAX_INPUT, cutoff)
+
+        loop_ms = _best_ms(loop, repeat)
+        numpy_ms = _best_ms(lambda: trim(batch.StoryBatch(stories)), repeat)
+        ops_ms = _best_ms(lambda: trim(built), repeat)
+        same = loop() == trim(batch.StoryBatch(stories)) == trim(built)
+        print(f"{n:>8} {loop_ms:>9.1f} {numpy_ms:>9.1f} {ops_ms:>9.1f}  {same}")
+
+
+def bench_cluster(args: argparse.Namespace) -> None:
+    import random
+
+    from . import cluster, config
+    from .story import Story
+
+    def pool(n: int) -> tuple[list[Story], int]:
+        """``n`` stories of random words; every fourth rewrites an earlier one
+        (a tenth of its words swapped, the trail cut short, another outlet)."""
+        rng = random.Random(n)
+        vocab = [f"w{i}" for i in range(20_000)]
+        stories: list[Story] = []
+        for i in range(n):
+            if i % 4 == 3:
+                base = stories[rng.randrange(len(stories))]
+                words = base.description.split()
+                for _ in range(len(words) // 10):
+                    words[rng.randrange(len(words))] = rng.choice(vocab)
+                stories.append(Story(base.title, " ".join(words[:36]), f"outlet {i % 7}", "world", None, None, f"https://x/{i}"))
+            else:
+                stories.append(Story(" ".join(rng.choices(vocab, k=10)), " ".join(rng.choices(vocab, k=40)),
+                                     f"outlet {i % 7}", "world", None, None, f"https://x/{i}"))
+        return stories, n // 4
+
+    def all_pairs(stories: list[Story]) -> int:
+        sets = [cluster.shingles(s) for s in stories]
+        return sum(
+            cluster.jaccard(sets[i], sets[j]) >= config.CLUSTER_THRESHOLD
+            for j in range(len(sets)) for i in range(j)
+        )
+
+    repeat = max(1, args.repeat // 10)
+    print(f"{'stories':>8} {'lsh ms':>9} {'pairs ms':>9} {'planted':>8} {'merged':>7}")
+    for n in args.sizes:
+        stories, planted = pool(n)
+        lsh_ms = _best_ms(lambda: cluster.clusters(stories), repeat)
+        pairs_ms = _best_ms(lambda: all_pairs(stories), 1)
+        merged = len(stories) - len(cluster.clusters(stories))
+        print(f"{n:>8} {lsh_ms:>9.0f} {pairs_ms:>9.0f} {planted:>8} {merged:>7}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks on recorded payloads.")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement (best is kept)")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("rss", help="src.rss against feedparser on recorded feeds")
+    p.add_argument("cassette", type=Path)
+    p.set_defaults(fn=bench_rss)
+    p = sub.add_parser("clean", help="normalize._clean against the three-pass cleaner on recorded text")
+    p.add_argument("cassette", type=Path)
+    p.set_defaults(fn=bench_clean)
+    p = sub.add_parser("stories", help="Story records against dicts: memory, build and JSON time")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    p.set_defaults(fn=bench_stories)
+    p = sub.add_parser("batch", help="curate trimming: Python loops against src.batch")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    p.set_defaults(fn=bench_batch)
+    p = sub.add_parser("cluster", help="near-duplicate clustering: src.cluster against every pair")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 2_000])
+    p.set_defaults(fn=bench_cluster)
+    args = parser.parse_args(argv)
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
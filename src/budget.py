@@ -0,0 +1,128 @@
+"""Yield-based request budgets for Guardian sections, NYT sections and Perigon queries.
+
+Every fetched item carries the key of the unit budget it came from
+(``_unit``, then ``Story.unit``: ``guardian:world``, ``nyt:business``,
+``perigon:markets`` ...).
+After curation the build records, per key, how many normalized stories it
+supplied and how many made the edition, as moving averages in
+``config.BUDGET_PATH``. Future runs size each request from that history:
+
+- ``size`` asks for about ``BUDGET_HEADROOM`` times the stories a key usually
+  gets into the edition, or more when nearly everything it sends is used
+  (saturated), clamped to [``BUDGET_MIN_SIZE``, ``BUDGET_MAX_SIZE``];
+- ``skip`` drops a key that has contributed nothing for ``BUDGET_MIN_RUNS``
+  runs, except on every ``BUDGET_PROBE_EVERY``-th run so it can earn its way
+  back. A skipped key supplies no stories, so ``record`` never sees it; the
+  skips are counted by ``skip`` itself.
+
+Keys with less history than ``BUDGET_MIN_RUNS`` keep the caller's default.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+
+from . import config
+from .store import load_json, save_json
+from .story import Story
+
+# A key whose average kept/supplied ratio reaches this is short of stories.
+_SATURATED = 0.5
+
+
+class Ledger:
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data: dict[str, dict] = data if data is not None else {}
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path(config.BUDGET_PATH)) -> "Ledger":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is not None:
+            with self._lock:
+                save_json(self.path, self.data)
+
+    def record(self, supplied: Counter, kept: Counter) -> None:
+        """Fold one run's per-key story counts into the moving averages."""
+        alpha = config.BUDGET_SMOOTHING
+        with self._lock:
+            for key in supplied.keys() | kept.keys():
+                entry = self.data.get(key)
+                if entry is None:
+                    self.data[key] = {"runs": 1, "supplied": float(supplied[key]), "kept": float(kept[key])}
+                    continue
+                entry["runs"] += 1
+                entry["supplied"] += alpha * (supplied[key] - entry["supplied"])
+                entry["kept"] += alpha * (kept[key] - entry["kept"])
+
+    def _entry(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self.data.get(key)
+            return dict(entry) if entry and entry["runs"] >= config.BUDGET_MIN_RUNS else None
+
+    def size(self, key: str, default: int) -> int:
+        """Items to request for ``key`` (``default`` until it has history)."""
+        entry = self._entry(key)
+        if entry is None:
+            return default
+        want = entry["kept"] * config.BUDGET_HEADROOM
+        if entry["supplied"] and entry["kept"] / entry["supplied"] >= _SATURATED:
+            want = max(want, entry["supplied"] * config.BUDGET_HEADROOM)
+        return min(config.BUDGET_MAX_SIZE, max(config.BUDGET_MIN_SIZE, math.ceil(want)))
+
+    def skip(self, key: str) -> bool:
+        """Whether to leave ``key`` out this run: it has yielded nothing lately.
+
+        Call once per run per key: each call that skips counts towards the
+        next probe.
+        """
+        entry = self._entry(key)
+        if entry is None or entry["kept"] >= 0.05:
+            return False
+        with self._lock:
+            live = self.data[key]
+            live["skipped"] = live.get("skipped", 0) + 1
+            if live["skipped"] >= config.BUDGET_PROBE_EVERY:
+                live["skipped"] = 0
+                return False
+        return True
+
+
+def summary(supplied: Counter, kept: Counter) -> str:
+    return ", ".join(f"{key}={kept[key]}/{supplied[key]}" for key in sorted(supplied.keys() | kept.keys()))
+
+
+def attribute(stories: list[Story], edition: dict) -> tuple[Counter, Counter]:
+    """(supplied, kept) story counts per budget key (``Story.unit``).
+
+    Edition stories are matched back to the normalized ones by link, which
+    curation preserves.
+    """
+    supplied = Counter(s.unit for s in stories if s.unit)
+    unit_by_link = {s.link: s.unit for s in stories if s.unit}
+    kept = Counter(
+        unit_by_link[st.get("link")]
+        for section in edition.get("sections", [])
+        for st in section.get("stories", [])
+        if st.get("link") in unit_by_link
+    )
+    return supplied, kept
+
+
+_ledger: Ledger | None = None
+_ledger_lock = threading.Lock()
+
+
+def current() -> Ledger:
+    """The process-wide budget ledger, loaded on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger.load()
+        return _ledger
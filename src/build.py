@@ -4,18 +4,26 @@ Single entrypoint chaining the whole pipeline:
 
     weather -> fetch -> normalize -> curate -> resolve_images -> render
 
+(fetch and normalize run as one streamed stage.)
+
 Each stage failure is logged with its stage name and exits non-zero so CI
 surfaces it. A one-line summary prints at the end.
+
+``--record CASSETTE`` saves every HTTP exchange (weather and all sources) to a
+compressed cassette; ``--replay CASSETTE`` rebuilds from one with no network
+calls for those stages (curation still calls Gemini).
 """
 
 from __future__ import annotations
 
+import argparse
 import logging
 import sys
 
+from . import budget, cassette, client
 from . import weather as weather_mod
 from .curate import curate
-from .fetch import fetch_all
+from .fetch import add_cassette_args, iter_fetch, start_cassette
 from .images import resolve_images
 from .normalize import normalize
 from .render import render
@@ -23,23 +31,35 @@ from .render import render
 log = logging.getLogger("the-daily.build")
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build today's edition.")
+    add_cassette_args(parser)
+    args = parser.parse_args(argv)
+
     stage = "start"
     try:
+        start_cassette(args)
+
         stage = "weather"
         weather = weather_mod.get_weather()
 
-        stage = "fetch"
-        raw = fetch_all()
-
-        stage = "normalize"
-        stories = normalize(raw)
+        # Normalize consumes the fetch stream as each source lands, so the two
+        # stages overlap; a failure in either is reported as fetch/normalize.
+        stage = "fetch/normalize"
+        stories = normalize(iter_fetch())
+        cassette.save()
         log.info("normalized %d stories", len(stories))
         if not stories:
             raise RuntimeError("no stories fetched; aborting before curation")
 
         stage = "curate"
         edition = curate(stories, weather=weather)
+        supplied, kept = budget.attribute(stories, edition)
+        log.info("yield (kept/supplied): %s", budget.summary(supplied, kept))
+        # Canned responses say nothing about how the live sources yield today.
+        if cassette.mode() != "replay":
+            budget.current().record(supplied, kept)
+            budget.current().save()
 
         stage = "images"
         resolve_images(edition)
@@ -58,6 +78,7 @@ def main() -> int:
         "edition '%s' -> %s | sections=%d stories=%d images shown=%d suppressed=%d",
         edition.get("date", "?"), out, len(sections), len(all_stories), shown, suppressed,
     )
+    log.info("network: %s", client.summary())
     return 0
 
 
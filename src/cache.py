@@ -0,0 +1,105 @@
+"""On-disk LRU cache of byte bodies plus small JSON metadata.
+
+Entries live as ``<key>.bin`` files next to an ``index.json`` that records each
+entry's size, creation time, last access and caller metadata. When the total
+size passes ``max_bytes`` the least recently used entries are evicted; with a
+``ttl``, entries older than that many seconds read as misses and are removed.
+Hits, misses and evictions are counted for the run log. Safe to share between
+fetch threads.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from .store import load_json, save_json
+
+
+def cache_key(*parts: str) -> str:
+    """Stable hex key for the given strings (URLs may carry API keys; only the hash is stored)."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, root: Path, max_bytes: int, ttl: float | None = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] | None = None
+
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+
+    def _entries(self) -> dict[str, dict]:
+        if self._index is None:
+            self._index = load_json(self._index_path, {})
+        return self._index
+
+    def get(self, key: str) -> tuple[dict, bytes] | None:
+        """``(meta, body)`` for ``key``, refreshing its LRU position; None on a miss."""
+        with self._lock:
+            entry = self._entries().get(key)
+            body = None
+            if entry is not None and self._expired(entry):
+                self._drop(key)
+                self.stats["evictions"] += 1
+            elif entry is not None:
+                try:
+                    body = (self.root / f"{key}.bin").read_bytes()
+                except OSError:
+                    del self._entries()[key]
+            if body is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            entry["atime"] = time.time()
+            return entry.get("meta", {}), body
+
+    def peek(self, key: str) -> dict | None:
+        """Metadata for ``key`` without reading the body or counting a lookup."""
+        with self._lock:
+            entry = self._entries().get(key)
+            return dict(entry.get("meta", {})) if entry else None
+
+    def put(self, key: str, body: bytes, meta: dict | None = None) -> None:
+        with self._lock:
+            if len(body) > self.max_bytes:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            (self.root / f"{key}.bin").write_bytes(body)
+            now = time.time()
+            self._entries()[key] = {"size": len(body), "ctime": now, "atime": now, "meta": meta or {}}
+            self._evict()
+            save_json(self._index_path, self._entries())
+
+    def flush(self) -> None:
+        """Persist LRU positions refreshed by ``get`` since the last write."""
+        with self._lock:
+            if self._index is not None:
+                save_json(self._index_path, self._index)
+
+    def _expired(self, entry: dict) -> bool:
+        # Entries written before ctime was recorded count from their last access.
+        return self.ttl is not None and time.time() - entry.get("ctime", entry["atime"]) > self.ttl
+
+    def _drop(self, key: str) -> int:
+        (self.root / f"{key}.bin").unlink(missing_ok=True)
+        return self._entries().pop(key)["size"]
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        for key in [k for k, e in entries.items() if self._expired(e)]:
+            self._drop(key)
+            self.stats["evictions"] += 1
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["atime"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._drop(key)
+            self.stats["evictions"] += 1
@@ -0,0 +1,150 @@
+"""Record/replay cassettes for every HTTP exchange made through src.client.
+
+``record(path)`` captures each final response (status, a few headers, raw
+body) while the run talks to the real network; ``save()`` writes them to a
+gzip-compressed JSON cassette. ``replay(path)`` loads one back and answers
+``client.get`` from it with no network at all, so fetch, normalize, trimming
+and render can be benchmarked and profiled on the exact same payloads.
+
+API keys never reach the cassette: credential query parameters are replaced by
+``REDACTED`` in the stored URLs, and replay matches on the redacted URL. Repeat
+requests for one URL replay in recorded order (the last one sticks).
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import gzip
+import json
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+log = logging.getLogger("the-daily.cassette")
+
+REDACTED = "REDACTED"
+
+# Query parameters that carry credentials for the sources we call.
+_SECRET_PARAMS = {"api-key", "apikey", "key", "token"}
+
+# Response headers worth keeping (feedparser and the HTTP cache read these).
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_lock = threading.Lock()
+_mode: str | None = None  # "record" | "replay" | None
+_path: Path | None = None
+_exchanges: list[dict] = []
+_replay_index: dict[str, list[dict]] = {}
+
+
+def redact(url: str) -> str:
+    """``url`` with credential query values replaced by ``REDACTED``."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [
+        (k, REDACTED if k.lower() in _SECRET_PARAMS else v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def mode() -> str | None:
+    return _mode
+
+
+def record(path: Path) -> None:
+    """Start capturing exchanges; ``save()`` writes them to ``path``."""
+    global _mode, _path
+    with _lock:
+        _mode, _path = "record", Path(path)
+        _exchanges.clear()
+
+
+def load(path: Path) -> dict:
+    """The decoded cassette at ``path`` (``exchanges`` plus ``recorded_at``)."""
+    return json.loads(gzip.decompress(Path(path).read_bytes()))
+
+
+def body(exchange: dict) -> bytes:
+    """Raw response bytes of one recorded exchange."""
+    if exchange["encoding"] == "utf-8":
+        return exchange["body"].encode("utf-8")
+    return base64.b64decode(exchange["body"])
+
+
+def replay(path: Path) -> None:
+    """Serve ``client.get`` from the cassette at ``path`` instead of the network."""
+    global _mode, _path
+    data = load(path)
+    with _lock:
+        _mode, _path = "replay", Path(path)
+        _replay_index.clear()
+        for ex in data.get("exchanges", []):
+            _replay_index.setdefault(ex["url"], []).append(ex)
+    log.info(
+        "replaying %d exchanges from %s (recorded %s)",
+        len(data.get("exchanges", [])), path, data.get("recorded_at", "?"),
+    )
+
+
+def capture(url: str, resp: requests.Response) -> None:
+    """Record the final response to a request for ``url`` (no-op unless recording).
+
+    Keyed on the requested URL rather than ``resp.url`` so a redirected feed
+    replays under the address the fetcher actually asks for.
+    """
+    if _mode != "record":
+        return
+    body = resp.content or b""
+    try:
+        text, encoding = body.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        text, encoding = base64.b64encode(body).decode("ascii"), "base64"
+    entry = {
+        "url": redact(url),
+        "status": resp.status_code,
+        "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+        "encoding": encoding,
+        "body": text,
+    }
+    with _lock:
+        _exchanges.append(entry)
+
+
+def lookup(url: str) -> requests.Response:
+    """The recorded response for ``url``; raises ConnectionError when absent."""
+    key = redact(url)
+    with _lock:
+        queue = _replay_index.get(key)
+        if not queue:
+            raise requests.ConnectionError(f"not in cassette: {key}")
+        ex = queue.pop(0) if len(queue) > 1 else queue[0]
+    resp = requests.Response()
+    resp.status_code = ex["status"]
+    resp.headers = CaseInsensitiveDict(ex["headers"])
+    resp._content = body(ex)
+    resp.url = url
+    resp.reason = "OK (replayed)" if ex["status"] == 200 else "replayed"
+    return resp
+
+
+def save() -> Path | None:
+    """Write the recording, if any, and return its path."""
+    if _mode != "record" or _path is None:
+        return None
+    with _lock:
+        data = {
+            "version": 1,
+            "recorded_at": dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "exchanges": list(_exchanges),
+        }
+    _path.parent.mkdir(parents=True, exist_ok=True)
+    _path.write_bytes(gzip.compress(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+    log.info("recorded %d exchanges to %s", len(data["exchanges"]), _path)
+    return _path
@@ -0,0 +1,356 @@
+"""Shared HTTP client.
+
+Every outbound request (weather, the wire APIs, RSS feeds) goes through
+``get`` so connections are pooled and kept alive per host instead of paying a
+fresh TCP+TLS handshake on each call. Transient failures (connection errors,
+429 and 5xx) are retried with jittered exponential backoff that honors a
+server's ``Retry-After``; the caller's ``timeout`` bounds the whole exchange,
+retries and body included: ``requests`` applies it per socket read, so the body
+is also checked against the deadline between chunks, and a host trickling bytes
+past it is cut off with ``requests.Timeout``.
+
+With ``cache=True`` a response carrying an ``ETag`` or ``Last-Modified`` is
+kept in an on-disk LRU cache (``config.HTTP_CACHE_DIR``); the next request for
+the same URL sends ``If-None-Match``/``If-Modified-Since`` and a 304 is served
+from disk as an ordinary 200 response.
+
+Bodies are streamed and read up to a per-source byte cap
+(``config.FETCH_MAX_BYTES``); a larger payload is abandoned, counted, and
+raised as ``ResponseTooLarge`` instead of being read into memory in full. Bytes
+received are tallied per ``source`` label for the run log.
+
+When a cassette is active (src.cassette) every final response is recorded, or
+in replay mode answered from the cassette without touching the network.
+
+Connection setup is instrumented: ``stats()`` reports how many handshakes the
+run made and how long they took, and ``summary()`` formats that for the log.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from . import cassette, config
+from .cache import DiskCache, cache_key
+
+log = logging.getLogger("the-daily.client")
+
+USER_AGENT = "TheDaily/2.0 (+https://github.com/BenWassa/Hermes)"
+
+# Statuses worth another attempt; anything else is returned to the caller as is.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+_stats = {
+    "requests": 0, "retries": 0, "handshakes": 0, "connect_s": 0.0,
+    "cache_hits": 0, "cache_misses": 0, "oversized": 0,
+}
+# Wire bytes received per source label (see ``get``).
+_bytes: dict[str, int] = {}
+
+_CHUNK = 64 * 1024
+
+_http_cache = (
+    DiskCache(Path(config.HTTP_CACHE_DIR), config.HTTP_CACHE_MAX_BYTES) if config.HTTP_CACHE else None
+)
+
+
+def _count(key: str, amount: float = 1) -> None:
+    with _lock:
+        _stats[key] += amount
+
+
+class ResponseTooLarge(requests.RequestException):
+    """A response body exceeded its source's byte cap and was not read in full."""
+
+
+# --- Connection instrumentation -------------------------------------------
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        _count("handshakes")
+        _count("connect_s", time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        # urllib3 performs the TLS handshake inside connect(), so this times both.
+        start = time.perf_counter()
+        super().connect()
+        _count("handshakes")
+        _count("connect_s", time.perf_counter() - start)
+
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use the timed connection classes."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+
+def _session(url: str) -> requests.Session:
+    """The keep-alive session for this URL's host, created on first use."""
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        sess = _sessions.get(host)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers["User-Agent"] = USER_AGENT
+            # One host per session, so a single pool sized for the fetch worker
+            # count lets parallel units to the same API share warm connections.
+            adapter = _PooledAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_SIZE)
+            sess.mount("http://", adapter)
+            sess.mount("https://", adapter)
+            _sessions[host] = sess
+        return sess
+
+
+# --- Retries --------------------------------------------------------------
+
+def _retry_after(resp: requests.Response) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base * 2**attempt], capped."""
+    return random.uniform(0, min(config.HTTP_MAX_BACKOFF, config.HTTP_BACKOFF * (2 ** attempt)))
+
+
+# --- Bounded bodies -------------------------------------------------------
+
+def byte_cap(source: str) -> int:
+    """The body size cap for a source label such as ``perigon:markets``."""
+    caps = config.FETCH_MAX_BYTES
+    return caps.get(source.split(":", 1)[0], caps["default"])
+
+
+def _read_body(resp: requests.Response, source: str, give_up: float) -> None:
+    """Read a streamed body into ``resp`` up to the source's cap, tallying bytes.
+
+    Raises ``requests.Timeout`` if the body is still arriving at ``give_up``
+    (a ``time.monotonic`` deadline).
+    """
+    cap = byte_cap(source)
+    host = urlsplit(resp.url).netloc
+    declared = resp.headers.get("Content-Length", "")
+    if declared.isdigit() and int(declared) > cap:
+        resp.close()
+        _count("oversized")
+        raise ResponseTooLarge(f"{source} from {host}: declared {int(declared)} bytes > cap {cap}")
+    chunks: list[bytes] = []
+    size = 0
+    complete = False
+    try:
+        for chunk in resp.iter_content(_CHUNK):
+            size += len(chunk)
+            if size > cap:
+                _count("oversized")
+                raise ResponseTooLarge(f"{source} from {host}: body passed cap {cap} bytes")
+            if time.monotonic() > give_up:
+                raise requests.Timeout(f"{source} from {host}: body still arriving at the deadline ({size} bytes)")
+            chunks.append(chunk)
+        complete = True
+    finally:
+        # Wire bytes (before content decoding) are what the transfer cost;
+        # urllib3 can't count them for chunked bodies, so use the decoded size.
+        wire = (resp.raw.tell() if hasattr(resp.raw, "tell") else 0) or size
+        with _lock:
+            _bytes[source] = _bytes.get(source, 0) + wire
+        if not complete:
+            resp.close()
+    resp._content = b"".join(chunks)
+
+
+# --- Conditional GET ------------------------------------------------------
+
+# Response headers worth replaying on a cache hit (feedparser sniffs the type).
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def _conditional_headers(key: str, headers: dict | None) -> dict | None:
+    meta = _http_cache.peek(key) if _http_cache is not None else None
+    if not meta:
+        return headers
+    headers = dict(headers or {})
+    if meta.get("ETag"):
+        headers["If-None-Match"] = meta["ETag"]
+    if meta.get("Last-Modified"):
+        headers["If-Modified-Since"] = meta["Last-Modified"]
+    return headers
+
+
+def _through_cache(key: str, resp: requests.Response) -> requests.Response:
+    """Serve a 304 from disk, or store a fresh 200 that carries validators."""
+    if resp.status_code == 304:
+        hit = _http_cache.get(key)
+        if hit is None:
+            return resp
+        meta, body = hit
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.reason = "OK (not modified)"
+        cached.headers = CaseInsensitiveDict(meta)
+        cached._content = body
+        cached.url = resp.url
+        cached.request = resp.request
+        _count("cache_hits")
+        return cached
+    if resp.status_code == 200:
+        _count("cache_misses")
+        meta = {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers}
+        if "ETag" in meta or "Last-Modified" in meta:
+            _http_cache.put(key, resp.content, meta)
+    return resp
+
+
+def flush() -> None:
+    """Persist cache bookkeeping; call once at the end of a stage."""
+    if _http_cache is not None:
+        _http_cache.flush()
+
+
+def get(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float = 20,
+    retries: int = config.HTTP_RETRIES,
+    cache: bool = False,
+    source: str = "other",
+) -> requests.Response:
+    """GET through the pooled session for the URL's host.
+
+    ``timeout`` is the budget for the whole call: each attempt gets what is
+    left, and a backoff that would overrun it ends the retries early. The last
+    response is returned even when its status is an error, so callers keep
+    using ``raise_for_status``; the last exception is re-raised when no attempt
+    produced a response. ``cache=True`` makes the request conditional on the
+    cached copy (when there is one) and serves a 304 from disk. ``source``
+    (e.g. ``rss:CBC Toronto``) picks the byte cap by its prefix and labels the
+    bytes received; ``ResponseTooLarge`` is raised past the cap.
+    """
+    if cassette.mode() == "replay":
+        _count("requests")
+        return cassette.lookup(requests.Request("GET", url, params=params).prepare().url)
+    resp = _send(url, params, headers, timeout, retries, cache, source)
+    if cassette.mode() == "record":
+        cassette.capture(requests.Request("GET", url, params=params).prepare().url, resp)
+    return resp
+
+
+def _send(
+    url: str,
+    params: dict | None,
+    headers: dict | None,
+    timeout: float,
+    retries: int,
+    cache: bool,
+    source: str,
+) -> requests.Response:
+    sess = _session(url)
+    key = None
+    if cache and _http_cache is not None:
+        key = cache_key(requests.Request("GET", url, params=params).prepare().url)
+        headers = _conditional_headers(key, headers)
+    give_up = time.monotonic() + timeout
+    attempt = 0
+    error: Exception | None = None
+    while True:
+        remaining = give_up - time.monotonic()
+        _count("requests")
+        try:
+            resp = sess.get(
+                url, params=params, headers=headers, timeout=max(0.1, remaining), stream=True
+            )
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            resp, error = None, exc
+            if attempt >= retries:
+                raise
+            wait = _backoff(attempt)
+        else:
+            if resp.status_code not in _RETRY_STATUSES or attempt >= retries:
+                _read_body(resp, source, give_up)
+                return _through_cache(key, resp) if key else resp
+            hinted = _retry_after(resp)
+            wait = hinted if hinted is not None else _backoff(attempt)
+        if wait >= give_up - time.monotonic():
+            if resp is not None:
+                _read_body(resp, source, give_up)
+                return resp
+            raise error  # type: ignore[misc]
+        if resp is not None:
+            resp.close()  # release the connection without reading the error body
+        log.info("retrying %s in %.1fs (attempt %d)", urlsplit(url).netloc, wait, attempt + 1)
+        _count("retries")
+        time.sleep(wait)
+        attempt += 1
+
+
+# --- Reporting ------------------------------------------------------------
+
+def stats() -> dict:
+    """Counters since start (or the last ``reset_stats``)."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats() -> None:
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0 if key != "connect_s" else 0.0
+        _bytes.clear()
+
+
+def bytes_by_source() -> dict[str, int]:
+    """Wire bytes received per source label since start."""
+    with _lock:
+        return dict(_bytes)
+
+
+def summary() -> str:
+    s = stats()
+    evictions = _http_cache.stats["evictions"] if _http_cache is not None else 0
+    received = sum(bytes_by_source().values())
+    return (
+        f"http requests={s['requests']} retries={s['retries']} "
+        f"handshakes={s['handshakes']} connect={s['connect_s']:.2f}s "
+        f"received={received / 1024:.0f}KB oversized={s['oversized']} "
+        f"cache hits={s['cache_hits']} misses={s['cache_misses']} evictions={evictions}"
+    )
@@ -0,0 +1,134 @@
+"""Near-duplicate clustering between normalize and curation trimming.
+
+normalize collapses exact duplicates only: the same canonical URL or the same
+headline. A wire story carried by five outlets, or a story rewritten between
+updates, still reaches the model five times. The model would then pay input
+tokens for each copy, and the round-robin in ``curate._trim_input`` could give
+several slots to one event. This stage collapses those copies first:
+
+- each story becomes a set of word shingles (``CLUSTER_SHINGLE`` consecutive
+  words of its title and description);
+- a MinHash signature estimates the Jaccard similarity between any two of
+  those sets. Each shingle is hashed once with SHAKE-128, and the digest is read
+  as one 32-bit value per hash function, so the per-function minimums are taken
+  in C (``map(min, ...)``) and not in a Python loop;
+- LSH banding cuts each signature into ``CLUSTER_BANDS`` bands of
+  ``CLUSTER_ROWS`` values, and stories that share any band become candidate
+  pairs. That is roughly linear in the number of stories, where comparing
+  every pair is quadratic;
+- candidates whose exact shingle Jaccard reaches ``CLUSTER_THRESHOLD`` are
+  joined, and the joins carry through (union-find).
+
+Each cluster becomes one story, the richest member (has an image, then the
+longest description). Its ``also`` field lists the other members' outlets,
+which the model sees as ``also_reported_by``. The hashing is unseeded, so the
+same stories always cluster the same way.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import re
+from array import array
+from collections import defaultdict
+
+from . import config, tokens
+from .story import Story
+
+log = logging.getLogger("the-daily.cluster")
+
+_WORD_RE = re.compile(r"\w+")
+# Unsigned 32-bit array items; "I" is 4 bytes on every platform CPython supports.
+_ITEM = "I" if array("I").itemsize == 4 else "L"
+
+
+def shingles(story: Story, size: int = config.CLUSTER_SHINGLE) -> frozenset[str]:
+    """``size``-word shingles of the story's title and description, case-folded."""
+    words = _WORD_RE.findall(f"{story.title} {story.description}".casefold())
+    grams = frozenset(" ".join(words[i : i + size]) for i in range(len(words) - size + 1))
+    # Texts shorter than one shingle are compared word by word.
+    return grams or frozenset(words)
+
+
+def signature(grams: frozenset[str], width: int) -> tuple[int, ...]:
+    """MinHash signature of ``width`` values: per hash function, the minimum
+    over ``grams``."""
+    rows = [array(_ITEM, hashlib.shake_128(g.encode()).digest(4 * width)) for g in grams]
+    return tuple(map(min, *rows)) if len(rows) > 1 else tuple(rows[0])
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def clusters(stories: list[Story]) -> list[list[int]]:
+    """Groups of story indices that are near duplicates, singletons included.
+
+    Groups are ordered by their first member, and members keep input order.
+    """
+    rows = config.CLUSTER_ROWS
+    sets = [shingles(s) for s in stories]
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for i, grams in enumerate(sets):
+        if not grams:
+            continue
+        sig = signature(grams, config.CLUSTER_BANDS * rows)
+        for band in range(config.CLUSTER_BANDS):
+            buckets[(band, sig[band * rows : (band + 1) * rows])].append(i)
+
+    parent = list(range(len(stories)))
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, j in enumerate(members):
+            for i in members[:pos]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if _find(parent, i) != _find(parent, j) and jaccard(sets[i], sets[j]) >= config.CLUSTER_THRESHOLD:
+                    parent[_find(parent, j)] = _find(parent, i)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(stories)):
+        groups.setdefault(_find(parent, i), []).append(i)
+    return sorted(groups.values(), key=lambda g: g[0])
+
+
+def _tokens(story: Story) -> int:
+    # Estimated on the row curation sends (any id; they are all about as long).
+    return tokens.current().estimate(json.dumps(story.to_row("s1"), ensure_ascii=False))
+
+
+def collapse(stories: list[Story]) -> list[Story]:
+    """One story per near-duplicate cluster, with the others' outlets in ``also``.
+
+    The richest member represents the cluster, in the place of its first
+    member. Logs how many stories collapsed and the input tokens that saves.
+    """
+    out: list[Story] = []
+    saved = 0
+    for group in clusters(stories):
+        members = [stories[i] for i in group]
+        if len(members) == 1:
+            out.append(members[0])
+            continue
+        best = max(members, key=lambda s: (s.image is not None, len(s.description)))
+        also = tuple(dict.fromkeys(s.source for s in members if s.source != best.source))
+        rep = dataclasses.replace(best, also=also)
+        out.append(rep)
+        saved += sum(_tokens(s) for s in members) - _tokens(rep)
+    if len(out) < len(stories):
+        log.info(
+            "clustered %d near-duplicate(s) into %d stories (~%d input tokens saved)",
+            len(stories) - len(out), len(out), saved,
+        )
+    return out
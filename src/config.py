@@ -57,6 +57,14 @@ GUARDIAN_SECTIONS = {
     "commentisfree": "opinion",
 }
 
+# GUARDIAN_COALESCE=1 fetches every Guardian section above with one OR'd section
+# filter ("world|business|sport|commentisfree") instead of one request each,
+# then splits the results by each item's sectionId. Sections still short after
+# that page (newest-first ordering favours the busy ones) get their own request.
+# Off by default: the per-section requests run in parallel anyway, so this
+# saves requests, not time.
+GUARDIAN_COALESCE = os.environ.get("GUARDIAN_COALESCE", "0") != "0"
+
 # NYT Top Stories API sections -> our section hint.
 NYT_SECTIONS = {
     "world": "world",
@@ -99,6 +107,123 @@ TORONTO_RSS = [
     },
 ]
 
+# Fetch stage concurrency. Every Guardian section, NYT section, Perigon query and
+# RSS feed is fetched in parallel on at most FETCH_WORKERS threads, and the whole
+# stage must finish within FETCH_DEADLINE seconds of wall clock; units still
+# running at the deadline are dropped and the build carries on with what arrived.
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+FETCH_DEADLINE = float(os.environ.get("FETCH_DEADLINE", "45"))
+# Demand-driven fetching: units start highest expected yield first, and once
+# every section hint has CURATE_MAX_INPUT / hints x FETCH_DEMAND_MARGIN
+# candidates (what curate's trimmer can use, plus headroom for dedupe) the
+# remaining units are cancelled. FETCH_DEMAND=0 always fetches everything.
+FETCH_DEMAND = os.environ.get("FETCH_DEMAND", "1") != "0"
+FETCH_DEMAND_MARGIN = 1.5
+
+# Shared HTTP client (src/client.py). One keep-alive session per host whose pool
+# holds HTTP_POOL_SIZE connections, so parallel units to the same API reuse warm
+# connections. Connection errors, 429 and 5xx are retried up to HTTP_RETRIES
+# times with full-jitter backoff (HTTP_BACKOFF * 2**attempt, capped at
+# HTTP_MAX_BACKOFF seconds) unless the server sends a Retry-After.
+HTTP_POOL_SIZE = FETCH_WORKERS
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.5
+HTTP_MAX_BACKOFF = 8.0
+
+# Response bodies are streamed and capped per source (keyed by the source label
+# prefix: guardian, nyt, perigon, rss, weather). A larger body is abandoned,
+# counted as oversized and fails that unit, rather than being read into memory.
+FETCH_MAX_BYTES = {
+    "guardian": 2 * 1024 * 1024,
+    "nyt": 2 * 1024 * 1024,
+    "perigon": 4 * 1024 * 1024,
+    "rss": 3 * 1024 * 1024,
+    "weather": 256 * 1024,
+    "default": 5 * 1024 * 1024,
+}
+
+# Conditional-GET cache for the feeds and news APIs. Bodies that come with an
+# ETag or Last-Modified are kept on disk; later requests (the repeated cron
+# attempts, local rebuilds) send If-None-Match / If-Modified-Since and a 304 is
+# served from disk. Least recently used entries are evicted past the size cap.
+# Set HTTP_CACHE=0 to bypass it.
+HTTP_CACHE = os.environ.get("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_DIR = "data/cache/http"
+HTTP_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+# Per-unit health ledger + circuit breaker (src/health.py). After
+# BREAKER_THRESHOLD consecutive failures a unit is skipped for BREAKER_COOLDOWN
+# seconds (doubling after each failed probe); once that passes, one probe goes
+# out with a BREAKER_PROBE_TIMEOUT-second timeout and success closes the breaker.
+HEALTH_PATH = "data/state/health.json"
+# Adaptive per-unit timeouts from that ledger: p99 latency x FETCH_TIMEOUT_FACTOR,
+# kept between FETCH_TIMEOUT_FLOOR and FETCH_TIMEOUT_CEILING seconds (units with
+# no history get the ceiling). Units are also started fastest-first so quick
+# APIs never queue behind a slow feed host for a worker.
+FETCH_TIMEOUT_FACTOR = 3.0
+FETCH_TIMEOUT_FLOOR = 4.0
+FETCH_TIMEOUT_CEILING = 20.0
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 2 * 3600
+BREAKER_PROBE_TIMEOUT = 5.0
+
+# Incremental fetch (src/pool.py). Each unit remembers the newest publish time
+# it has seen today and the items it fetched; later attempts the same day ask
+# Guardian/Perigon only for newer items and merge them into that pool, capped at
+# POOL_MAX_ITEMS per unit, newest first. The pool resets each Toronto day.
+POOL_PATH = "data/state/pool.json"
+POOL_MAX_ITEMS = 50
+
+# Parse well-formed RSS/Atom with the lean iterparse reader in src/rss.py and
+# keep feedparser only as the fallback for feeds it can't read. Compare the two
+# on recorded feeds with `python -m src.bench rss CASSETTE`.
+RSS_FAST_PARSER = os.environ.get("RSS_FAST_PARSER", "1") != "0"
+
+# RSS feed fleet (src/fleet.py). Feeds are TORONTO_RSS plus any OPML file at
+# FEEDS_OPML. Each feed is polled only when due: about FEED_POLL_FACTOR times
+# its typical gap between stories after a poll with news, twice the previous
+# interval after a quiet one. Feeds not due are served from their last poll's
+# items (up to FEED_CACHE_ITEMS, none older than FEED_CACHE_MAX_AGE). Intervals
+# and ages are seconds. FEED_SCHEDULE=0 polls every feed on every build.
+FEEDS_OPML = os.environ.get("FEEDS_OPML", "data/feeds.opml")
+FLEET_PATH = "data/state/fleet.json"
+FEED_SCHEDULE = os.environ.get("FEED_SCHEDULE", "1") != "0"
+FEED_POLL_FACTOR = 0.5
+FEED_MIN_INTERVAL = 15 * 60
+FEED_MAX_INTERVAL = 12 * 3600
+FEED_DEFAULT_INTERVAL = 3600
+FEED_CADENCE_SAMPLE = 20
+FEED_CACHE_ITEMS = 30
+FEED_CACHE_MAX_AGE = 48 * 3600
+
+# API quotas (src/quota.py). per_minute paces calls with a token bucket;
+# per_day is enforced from a ledger persisted across runs, so a rerun that would
+# only earn 429s skips the call (or, for Gemini, goes straight to the fallback
+# model). Gemini limits apply per model. Defaults follow the free tiers; raise
+# them to match a paid plan.
+QUOTA_PATH = "data/state/quota.json"
+QUOTAS = {
+    "nyt": {"per_minute": 5, "per_day": 500},
+    "perigon": {"per_minute": 10, "per_day": 50},
+    "gemini": {"per_minute": 10, "per_day": 250},
+}
+
+# Yield-based request budgets (src/budget.py). After each build, record per
+# Guardian section / NYT section / Perigon query how many stories it supplied
+# and how many the edition kept (moving average, BUDGET_SMOOTHING weight on the
+# latest run). With BUDGET_MIN_RUNS of history, request BUDGET_HEADROOM x the
+# usual kept count (within BUDGET_MIN_SIZE..BUDGET_MAX_SIZE) and skip keys that
+# keep nothing, probing them every BUDGET_PROBE_EVERY runs. BUDGET=0 turns the
+# allocation off (counts are still recorded).
+BUDGET_PATH = "data/state/budget.json"
+BUDGET = os.environ.get("BUDGET", "1") != "0"
+BUDGET_SMOOTHING = 0.3
+BUDGET_MIN_RUNS = 3
+BUDGET_HEADROOM = 2.0
+BUDGET_MIN_SIZE = 3
+BUDGET_MAX_SIZE = 30
+BUDGET_PROBE_EVERY = 5
+
 
 # --- Gemini (curation model) ----------------------------------------------
 
@@ -106,15 +231,61 @@ TORONTO_RSS = [
 # (e.g. "gemini-2.0-flash" or "gemini-2.5-flash-lite") if you hit free limits.
 CURATE_MODEL = os.environ.get("CURATE_MODEL", "gemini-2.5-flash")
 CURATE_MAX_TOKENS = 16000
+# Longest title or description normalize keeps, in characters (cut at a word
+# boundary). Trail texts run a few hundred; this only bites on full bodies.
+CLEAN_MAX_CHARS = 1000
 # Cap raw stories sent to the model (PRD targets ~40-60), balanced across
 # section hints so Toronto and the wire sections all stay represented.
 CURATE_MAX_INPUT = 60
+# Stories published longer ago than this are not offered to the model.
+CURATE_MAX_AGE_HOURS = 48
+# Estimated token budget for the stories in the curate prompt (the system
+# prompt not counted). _trim_input packs up to CURATE_MAX_INPUT stories into it:
+# descriptions get shorter first, down to CURATE_MIN_DESCRIPTION characters, and
+# only then are the lowest-ranked stories dropped.
+CURATE_INPUT_TOKENS = int(os.environ.get("CURATE_INPUT_TOKENS", "12000"))
+CURATE_MIN_DESCRIPTION = 120
+# Token estimates (src/tokens.py) use TOKENS_CHARS_PER_TOKEN until calibrated
+# against Gemini's own counts. TOKENS_SMOOTHING is the weight each new count
+# gets. CURATE_COUNT_TOKENS=1 also asks count_tokens for an exact count before
+# each curate call.
+TOKENS_PATH = "data/state/tokens.json"
+TOKENS_CHARS_PER_TOKEN = 4.0
+TOKENS_SMOOTHING = 0.3
+CURATE_COUNT_TOKENS = os.environ.get("CURATE_COUNT_TOKENS", "0") != "0"
+# From this many normalized stories up, trimming runs on NumPy column arrays
+# (src/batch.py) when NumPy is installed. Building the columns from Story records
+# costs about as much as the loops themselves (`python -m src.bench batch`), so
+# by default only very large backfills take that path.
+BATCH_MIN_STORIES = int(os.environ.get("BATCH_MIN_STORIES", "1000000"))
+# Near-duplicate clustering before trimming (src/cluster.py). Stories are
+# compared as sets of CLUSTER_SHINGLE-word shingles. MinHash signatures are
+# split into CLUSTER_BANDS LSH bands of CLUSTER_ROWS values each, and stories
+# sharing a band become candidate pairs. A pair merges when its exact Jaccard
+# similarity is at least CLUSTER_THRESHOLD. With 20 x 3, a pair at 0.5 becomes
+# a candidate about 93% of the time, and a pair at 0.6 about 99%. Each cluster
+# reaches the model as one story listing the other outlets. CLUSTER=0 turns the
+# stage off.
+CLUSTER = os.environ.get("CLUSTER", "1") != "0"
+CLUSTER_SHINGLE = 2
+CLUSTER_BANDS = 20
+CLUSTER_ROWS = 3
+CLUSTER_THRESHOLD = 0.5
 # Reasoning budget for the curate call (2.5-series models). A modest budget lets
 # the model actually weigh, dedupe, rank, and synthesize rather than paraphrase,
 # which is what lifts the lead summaries and the "why it matters" analysis. Set
 # to 0 to disable thinking (fastest, cheapest) or -1 for a dynamic budget. One
 # call per day, so the extra latency/tokens are immaterial on the free tier.
 CURATE_THINKING_BUDGET = int(os.environ.get("CURATE_THINKING_BUDGET", "1024"))
+# Curate responses cached on disk (src/cache.py). The key hashes the story rows,
+# the system prompt, the model and the generation config, so a rerun on
+# unchanged input reuses the edition instead of calling Gemini. Entries expire
+# after CURATE_CACHE_TTL seconds, and past CURATE_CACHE_MAX_BYTES the least
+# recently used go first. Set CURATE_CACHE=0 to always call the model.
+CURATE_CACHE = os.environ.get("CURATE_CACHE", "1") != "0"
+CURATE_CACHE_DIR = "data/cache/curate"
+CURATE_CACHE_TTL = 12 * 3600
+CURATE_CACHE_MAX_BYTES = 5 * 1024 * 1024
 
 
 # --- Weather (Open-Meteo weather_code mapping) ----------------------------
@@ -226,7 +397,7 @@ def build_curate_system_prompt(today=None) -> str:
     section_lines = "\n".join(
         f'  - "{s["id"]}" ({s["label"]}, max {s["cap"]} stories)' for s in SECTIONS
     )
-    return f"""You are the editor of The Daily, a Toronto morning newspaper. Today's edition is dated {today.strftime("%A, %B %-d, %Y")}. You are given a JSON array of raw news stories pulled from wire APIs and Toronto RSS feeds. Produce the finished edition.
+    return f"""You are the editor of The Daily, a Toronto morning newspaper. Today's edition is dated {today.strftime("%A, %B %-d, %Y")}. You are given raw news stories pulled from wire APIs and Toronto RSS feeds, as a JSON array of rows. The first row names the columns: "id", "section_hint", "source", "published" (UTC, MM-DD HH:MM), "title", "description", "also_reported_by". Every other row is one story. Produce the finished edition.
 
 This date may be after your training cutoff. Do not assume an officeholder,
 title, or ongoing situation matches what you last learned; defer to what the
@@ -235,7 +406,7 @@ actively exercising an office, they hold that office now, regardless of what
 you recall about their status.
 
 Your tasks:
-1. DEDUPE: collapse the same event reported by multiple outlets into one story; keep the best-sourced, most complete version.
+1. DEDUPE: collapse the same event reported by multiple outlets into one story; keep the best-sourced, most complete version. Near-identical copies are already merged: a story's "also_reported_by" lists the other outlets that ran it, and wide coverage is a sign of importance.
 2. SECTION: assign every surviving story to exactly one section:
 {section_lines}
 3. RANK: order stories within each section by importance; mark exactly one story per section with "lead": true.
@@ -260,11 +431,9 @@ Output STRICT JSON only. No preamble, no markdown fences, no commentary. Match t
           "sub": "...",
           "summary": "...",
           "analysis": "... or null",
-          "time": "6:45 AM",
           "tag": "DEVELOPING",
           "sensitivity": false,
-          "image": "https://... or null",
-          "link": "https://..."
+          "sources": ["s12", "s4"]
         }}
       ]
     }}
@@ -275,7 +444,6 @@ Rules:
 - Include every section id listed above, in that order, each with at least one story when source material allows.
 - "kicker" is a short uppercase topic label derived from the story (e.g. "UKRAINE", "MARKETS").
 - "analysis" is present only on lead stories; null everywhere else.
-- "image" and "link" come from the source story; preserve them. If no image, use null.
-- "time" is a short human time/day string from the story's publish time (e.g. "6:45 AM", "Yesterday").
+- "sources" lists the ids of the input rows the story is built from, best-sourced first. Its link, image and time are taken from the first one, so use only ids that appear in the input.
 - "id" values are short and unique within the edition.
 - Return ONLY the JSON object."""
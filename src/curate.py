@@ -8,21 +8,37 @@ Gemini's free tier (Google AI Studio key) comfortably covers one run per day.
 `response_mime_type="application/json"` forces valid JSON; the detailed system
 prompt carries the exact schema, and a post-pass (exactly one lead per section,
 caps) plus a single retry keep the result well formed.
+
+Stories go to the model as compact rows, each with a short id (``s1``, ``s2``
+...) and only the text fields it edits from. No image or link URLs are sent.
+The model names the ids each edition story draws on, and the post-pass
+attaches the first one's link, image and publish time locally, so the URLs
+cost no tokens in either direction.
+
+Responses are cached (``config.CURATE_CACHE``) under a hash of everything that
+shapes them: the story rows, system prompt, model and generation config. A
+rebuild on unchanged input then returns the stored edition without a call.
 """
 
 from __future__ import annotations
 
+import dataclasses
 import datetime as dt
 import json
 import logging
+import math
 import os
 import time
+from pathlib import Path
 
 from google import genai
 from google.genai import errors as genai_errors
 from google.genai import types
 
-from . import config
+from . import batch, cluster, config, quota, tokens
+from .cache import DiskCache, cache_key
+from .normalize import truncate
+from .story import ROW_COLUMNS, Story, display_time
 
 log = logging.getLogger("the-daily.curate")
 
@@ -32,6 +48,22 @@ _RETRY_CODES = {429, 500, 503}
 # If the configured model hits quota exhaustion, fall back to this.
 _FALLBACK_MODEL = "gemini-2.5-flash"
 
+_response_cache = (
+    DiskCache(Path(config.CURATE_CACHE_DIR), config.CURATE_CACHE_MAX_BYTES, ttl=config.CURATE_CACHE_TTL)
+    if config.CURATE_CACHE
+    else None
+)
+
+
+def _daily_quota_error(exc: genai_errors.APIError) -> bool:
+    """Whether a 429 says the day's quota is gone, not just this minute's.
+
+    Gemini names the exhausted limit in the error (``quotaId`` such as
+    ``GenerateRequestsPerDayPerProjectPerModel-FreeTier``).
+    """
+    text = f"{exc} {json.dumps(getattr(exc, 'details', None), default=str)}"
+    return "PerDay" in text
+
 
 def _client() -> genai.Client:
     key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
@@ -60,62 +92,234 @@ def _gen_config(today: dt.date, model: str | None = None) -> types.GenerateConte
 
 
 def _generate(client: genai.Client, contents: str, today: dt.date, retries: int = 3):
-    """generate_content with backoff on transient errors; falls back to gemini-2.5-flash on quota exhaustion."""
+    """generate_content with backoff on transient errors; falls back to gemini-2.5-flash on quota exhaustion.
+
+    Returns the model that answered and its response.
+
+    Each model's calls go through the quota ledger (src.quota): a model whose
+    daily quota is already spent is skipped up front instead of earning 429s,
+    calls are paced to the per-minute limit, and a model whose 429 names its
+    per-day limit is marked spent for the rest of the day. A per-minute 429
+    that outlasts the retries only fails this attempt.
+    """
     models_to_try = [config.CURATE_MODEL]
     if config.CURATE_MODEL != _FALLBACK_MODEL:
         models_to_try.append(_FALLBACK_MODEL)
 
+    ledger = quota.ledger()
     last: Exception | None = None
-    for model in models_to_try:
-        cfg = _gen_config(today, model)
-        for attempt in range(retries + 1):
-            try:
-                return client.models.generate_content(
-                    model=model, contents=contents, config=cfg
-                )
-            except genai_errors.APIError as exc:
-                code = getattr(exc, "code", None)
-                if code in _RETRY_CODES and attempt < retries:
-                    # Use longer waits: Gemini free-tier often needs 30-60s to recover.
-                    wait = min(60, 5 * (2 ** attempt))  # 5, 10, 20 … capped at 60s
-                    log.warning("Gemini %s on %s; retrying in %ss", code, model, wait)
-                    time.sleep(wait)
+    try:
+        for model in models_to_try:
+            provider = f"gemini:{model}"
+            if not ledger.allow(provider):
+                log.warning("Gemini quota for %s used up today; skipping it", model)
+                last = quota.QuotaExceeded(f"{provider} daily quota used up")
+                continue
+            cfg = _gen_config(today, model)
+            for attempt in range(retries + 1):
+                try:
+                    ledger.acquire(provider, wait=60)
+                except quota.QuotaExceeded as exc:
                     last = exc
-                    continue
-                last = exc
-                if code == 429 and model != models_to_try[-1]:
-                    log.warning("Quota exhausted on %s; switching to fallback %s", model, models_to_try[-1])
-                break  # move to next model in list
+                    break
+                try:
+                    resp = client.models.generate_content(
+                        model=model, contents=contents, config=cfg
+                    )
+                except genai_errors.APIError as exc:
+                    code = getattr(exc, "code", None)
+                    if code in _RETRY_CODES and attempt < retries:
+                        # Use longer waits: Gemini free-tier often needs 30-60s to recover.
+                        wait = min(60, 5 * (2 ** attempt))  # 5, 10, 20 … capped at 60s
+                        log.warning("Gemini %s on %s; retrying in %ss", code, model, wait)
+                        time.sleep(wait)
+                        last = exc
+                        continue
+                    last = exc
+                    if code == 429:
+                        if _daily_quota_error(exc):
+                            ledger.exhaust(provider)
+                        if model != models_to_try[-1]:
+                            log.warning("Quota exhausted on %s; switching to fallback %s", model, models_to_try[-1])
+                    break  # move to next model in list
+                usage = getattr(resp, "usage_metadata", None)
+                ledger.record_tokens(provider, getattr(usage, "total_token_count", 0) or 0)
+                return model, resp
+    finally:
+        ledger.save()
 
     raise last  # type: ignore[misc]
 
 
-def _call(client: genai.Client, stories: list[dict], today: dt.date, reinforce: bool = False) -> dict:
-    user_content = json.dumps(stories, ensure_ascii=False)
+def _story_id(index: int) -> str:
+    return f"s{index + 1}"
+
+
+def _encode_story(story: Story, index: int) -> str:
+    return json.dumps(story.to_row(_story_id(index)), ensure_ascii=False)
+
+
+def _encode(stories: list[Story]) -> str:
+    """The user message: a JSON array of the header row (the system prompt
+    explains it), then one row per story."""
+    rows = [json.dumps(ROW_COLUMNS)] + [_encode_story(s, i) for i, s in enumerate(stories)]
+    return "[" + ",\n".join(rows) + "]"
+
+
+def _count_tokens(client: genai.Client, text: str) -> int | None:
+    """Gemini's own token count for ``text``; None if the call fails."""
+    try:
+        return client.models.count_tokens(model=config.CURATE_MODEL, contents=text).total_tokens
+    except genai_errors.APIError as exc:
+        log.warning("count_tokens failed: %s", exc)
+        return None
+
+
+def _call(client: genai.Client, stories: list[Story], today: dt.date, reinforce: bool = False) -> list[dict]:
+    """One curation round trip: the normalized sections for ``stories``.
+
+    Responses are cached only when the configured model answered and they
+    normalize to at least one section; anything else is regenerated on the
+    next run.
+    """
+    user_content = _encode(stories)
     if reinforce:
         user_content = "Return ONLY valid JSON matching the schema.\n\n" + user_content
-    resp = _generate(client, user_content, today)
+    key = cache_key(
+        user_content,
+        config.CURATE_MODEL,
+        # The generation config carries the system prompt (and so the date).
+        _gen_config(today).model_dump_json(exclude_none=True),
+    )
+    if _response_cache is not None:
+        hit = _response_cache.get(key)
+        if hit is not None:
+            log.info("curate cache hit (%s); skipping the Gemini call", key[:12])
+            _response_cache.flush()
+            return _normalize_edition(json.loads(hit[1]), stories, today)
+        log.info("curate cache miss (%s)", key[:12])
+    calibration = tokens.current()
+    if config.CURATE_COUNT_TOKENS:
+        counted = _count_tokens(client, user_content)
+        if counted:
+            log.info("story tokens: estimated %d, counted %d", calibration.estimate(user_content), counted)
+            calibration.observe(config.CURATE_MODEL, len(user_content), counted)
+    prompt_chars = len(config.build_curate_system_prompt(today)) + len(user_content)
+    estimated = math.ceil(prompt_chars / calibration.ratio())
+    model, resp = _generate(client, user_content, today)
+    actual = getattr(getattr(resp, "usage_metadata", None), "prompt_token_count", None)
+    if actual:
+        log.info("prompt tokens: estimated %d, actual %d", estimated, actual)
+        # The fallback model may have answered; its ratio is close enough to
+        # share one calibration entry per configured model.
+        calibration.observe(config.CURATE_MODEL, prompt_chars, actual)
+        calibration.save()
     text = resp.text
     if not text:
         reason = resp.candidates[0].finish_reason if resp.candidates else None
         raise RuntimeError(f"Empty curation response (finish_reason={reason})")
-    return json.loads(text)
-
-
-def _trim_input(stories: list[dict], total: int = config.CURATE_MAX_INPUT) -> list[dict]:
-    """Balance the raw stories across section hints, round-robin, up to `total`.
+    sections = _normalize_edition(json.loads(text), stories, today)
+    if _response_cache is not None and sections:
+        if model == config.CURATE_MODEL:
+            _response_cache.put(key, text.encode("utf-8"), {"model": model})
+        else:
+            # The key names the configured model: a fallback edition must
+            # not outlive the outage that produced it.
+            log.info("not caching the %s fallback response", model)
+    return sections
+
+
+def _trim_input(
+    stories: list[Story],
+    total: int = config.CURATE_MAX_INPUT,
+    now: float | None = None,
+    budget: int = config.CURATE_INPUT_TOKENS,
+) -> list[Story]:
+    """Balance the raw stories across section hints, round-robin, up to `total`
+    and about `budget` tokens.
 
     Keeps Toronto and each wire section represented rather than letting one
     prolific feed crowd out the rest, and keeps the prompt (and output) small.
+    Stories older than ``config.CURATE_MAX_AGE_HOURS`` are dropped (unless that
+    would drop everything) and each hint's stories go newest first; stories
+    without a parseable date are kept, after the dated ones. The result is
+    then packed into the token budget (``_pack``).
+
+    Large inputs (``config.BATCH_MIN_STORIES``) run the same steps on a
+    columnar src.batch when NumPy is installed.
     """
+    cutoff = (time.time() if now is None else now) - config.CURATE_MAX_AGE_HOURS * 3600
+    if len(stories) >= config.BATCH_MIN_STORIES and batch.available():
+        return _pack(_trim_batch(stories, total, cutoff), budget)
+    return _pack(_trim_loop(stories, total, cutoff), budget)
+
+
+def _shorten(story: Story, limit: int) -> Story:
+    if len(story.description) <= limit:
+        return story
+    return dataclasses.replace(story, description=truncate(story.description, limit))
+
+
+def _pack(stories: list[Story], budget: int) -> list[Story]:
+    """``stories`` (best first) fitted into about ``budget`` estimated tokens.
+
+    Descriptions are capped first, at the longest length that fits (no
+    shorter than ``config.CURATE_MIN_DESCRIPTION``). Only if the stories still
+    don't fit at that floor are the last ones dropped, and never the first
+    story of any section hint (the round-robin's first round), so a budget
+    too small for even those goes over rather than leaving a hint, or the
+    whole prompt, empty.
+    """
+    calibration = tokens.current()
+
+    def cost(limit: int) -> tuple[list[Story], list[int]]:
+        capped = [_shorten(s, limit) for s in stories]
+        return capped, [calibration.estimate(_encode_story(s, i)) + 1 for i, s in enumerate(capped)]
+
+    if not stories:
+        return stories
+    longest = max(len(s.description) for s in stories)
+    if sum(cost(longest)[1]) <= budget:
+        return stories
+    low, high = min(config.CURATE_MIN_DESCRIPTION, longest), longest
+    capped, costs = cost(low)
+    if sum(costs) <= budget:
+        # Longest description cap that still fits.
+        while low < high:
+            mid = (low + high + 1) // 2
+            if sum(cost(mid)[1]) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        capped, costs = cost(low)
+    used = sum(costs)
+    keep = len({s.section_hint for s in stories})
+    while len(capped) > keep and used > budget:
+        capped.pop()
+        used -= costs.pop()
+    if used > budget:
+        log.warning("one story per section hint needs ~%d tokens, over the %d budget", used, budget)
+    log.info(
+        "packed %d of %d stories into ~%d tokens (descriptions capped at %d chars)",
+        len(capped), len(stories), used, low,
+    )
+    return capped
+
+
+def _trim_loop(stories: list[Story], total: int, cutoff: float) -> list[Story]:
     from collections import defaultdict
 
-    buckets: dict[str, list[dict]] = defaultdict(list)
-    for s in stories:
-        buckets[s.get("section_hint", "world")].append(s)
+    recent = [s for s in stories if s.pub_ts is None or s.pub_ts >= cutoff]
+    if recent and len(recent) < len(stories):
+        log.info("dropped %d stories older than %sh", len(stories) - len(recent), config.CURATE_MAX_AGE_HOURS)
+        stories = recent
+
+    buckets: dict[str, list[Story]] = defaultdict(list)
+    for s in sorted(stories, key=lambda s: -s.pub_ts if s.pub_ts is not None else float("inf")):
+        buckets[s.section_hint].append(s)
 
     pools = list(buckets.values())
-    out: list[dict] = []
+    out: list[Story] = []
     while len(out) < total and any(pools):
         progressed = False
         for pool in pools:
@@ -129,16 +333,46 @@ def _trim_input(stories: list[dict], total: int = config.CURATE_MAX_INPUT) -> li
     return out
 
 
-def _normalize_edition(raw: dict) -> list[dict]:
+def _trim_batch(stories: list[Story], total: int, cutoff: float) -> list[Story]:
+    """``_trim_input`` as array operations on a src.batch.StoryBatch."""
+    cols = batch.StoryBatch(stories)
+    idx = cols.recent(cutoff, cols.all())
+    if len(idx) and len(idx) < len(cols):
+        log.info("dropped %d stories older than %sh", len(cols) - len(idx), config.CURATE_MAX_AGE_HOURS)
+    else:
+        idx = cols.all()
+    return cols.records(cols.round_robin(cols.newest_first(idx), total))
+
+
+def _attach_source(story: dict, by_id: dict[str, Story], today: dt.date) -> bool:
+    """Fill ``link``, ``image`` and ``time`` from the first input story the
+    model cited in ``sources``; False if it cited none that exist."""
+    ids = story.pop("sources", None) or []
+    source = next((by_id[i] for i in ([ids] if isinstance(ids, str) else ids) if i in by_id), None)
+    if source is None:
+        log.warning("dropping %r: no known source id in %r", story.get("headline"), ids)
+        return False
+    story["link"] = source.link
+    story["image"] = source.image
+    # The publish time is known exactly; don't leave "time" to the model.
+    story["time"] = display_time(source.pub_ts, today)
+    return True
+
+
+def _normalize_edition(raw: dict, inputs: list[Story], today: dt.date) -> list[dict]:
     """Enforce section order, caps, exactly one lead per section, and
-    analysis only on leads."""
+    analysis only on leads; re-attach each story's link, image and time from
+    the input stories it cites."""
+    by_source = {_story_id(i): s for i, s in enumerate(inputs)}
     by_id = {s.get("id"): s for s in raw.get("sections", [])}
     out: list[dict] = []
     for spec in config.SECTIONS:
         section = by_id.get(spec["id"])
         if not section or not section.get("stories"):
             continue
-        stories = section["stories"][: spec["cap"]]
+        stories = [st for st in section["stories"] if _attach_source(st, by_source, today)][: spec["cap"]]
+        if not stories:
+            continue
         seen_lead = False
         for story in stories:
             if story.get("lead") and not seen_lead:
@@ -156,21 +390,23 @@ def _normalize_edition(raw: dict) -> list[dict]:
     return out
 
 
-def curate(stories: list[dict], weather: dict | None = None, today: dt.date | None = None) -> dict:
+def curate(stories: list[Story], weather: dict | None = None, today: dt.date | None = None) -> dict:
     """Raw normalized stories -> finished edition dict (date, weather, sections)."""
     today = today or dt.date.today()
     client = _client()
+    if config.CLUSTER:
+        stories = cluster.collapse(stories)
     stories = _trim_input(stories)
     try:
-        raw = _call(client, stories, today)
+        sections = _call(client, stories, today)
     except json.JSONDecodeError:
         log.warning("First curate parse failed; retrying with reinforcement")
-        raw = _call(client, stories, today, reinforce=True)
+        sections = _call(client, stories, today, reinforce=True)
 
     return {
         "date": today.strftime("%A, %B %-d, %Y"),
         "weather": weather or {},
-        "sections": _normalize_edition(raw),
+        "sections": sections,
     }
 
 
@@ -182,7 +418,7 @@ if __name__ == "__main__":
 
     fixture = Path("data/fixtures/normalized_sample.json")
     if fixture.exists():
-        stories = json.loads(fixture.read_text())
+        stories = [Story.from_dict(s) for s in json.loads(fixture.read_text())]
     else:
         from .fetch import fetch_all
         from .normalize import normalize
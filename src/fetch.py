@@ -5,19 +5,39 @@ News API, and Toronto RSS feeds. Each source is wrapped so a failure (missing
 key, dead feed, network error) logs a warning and returns an empty list rather
 than crashing the run.
 
+Every Guardian section, NYT section, Perigon query and RSS feed is one fetch
+*unit*. ``iter_fetch`` fans the units out on a bounded worker pool under a
+single wall-clock deadline (``config.FETCH_DEADLINE``) and streams items out as
+each unit lands, so normalization overlaps the network waits; ``fetch_all``
+collects that stream into a list, and the per-source ``fetch_*`` helpers run
+their own units sequentially.
+Later attempts on the same day fetch incrementally from each unit's watermark
+and merge into the day's pool (src.pool).
+
 Each returned item is a source-native-ish dict carrying two helper keys the
 normalizer relies on: ``_src`` (guardian|nyt|perigon|rss) and ``_section_hint``.
+Items are projected down to the fields the normalizer reads as soon as they are
+decoded (``normalize.project``); ``iter_fetch`` logs what that saved per source.
 """
 
 from __future__ import annotations
 
 import logging
+import math
 import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterator, NamedTuple
 
 import feedparser
-import requests
 
-from . import config
+from . import budget, cassette, client, config, fleet, health, quota, rss
+from .normalize import project
+from .pool import Pool
 
 log = logging.getLogger("the-daily.fetch")
 
@@ -25,65 +45,344 @@ GUARDIAN_URL = "https://content.guardianapis.com/search"
 NYT_URL = "https://api.nytimes.com/svc/topstories/v2/{section}.json"
 PERIGON_URL = "https://api.perigon.io/v1/all"
 
-_TIMEOUT = 20
+# Timeout for the sequential debugging helpers; fetch_all/iter_fetch use the
+# adaptive per-unit timeouts from the health ledger instead.
+_TIMEOUT = config.FETCH_TIMEOUT_CEILING
 
 
-def fetch_guardian(page_size: int = 10) -> list[dict]:
-    """Guardian Content API across the configured sections."""
-    key = os.environ.get("GUARDIAN_API_KEY")
+def _api_key(name: str) -> str | None:
+    """The key from the environment; a placeholder when replaying a cassette,
+    whose recorded URLs carry redacted keys anyway."""
+    if cassette.mode() == "replay":
+        return cassette.REDACTED
+    return os.environ.get(name)
+
+
+def _spend(provider: str, timeout: float) -> float:
+    """Reserve one keyed request against the quota ledger (free when replaying).
+
+    Returns what is left of ``timeout`` after waiting for a rate slot, so the
+    request and the wait together stay within the unit's timeout. Raises
+    ``quota.QuotaExceeded`` when the provider is out for today or no rate slot
+    frees up within half the unit's timeout.
+    """
+    if cassette.mode() == "replay":
+        return timeout
+    began = time.monotonic()
+    quota.ledger().acquire(provider, wait=timeout / 2)
+    return timeout - (time.monotonic() - began)
+
+
+# Deep size of raw items per source, before and after projection:
+# {src: [items, bytes before, bytes after]}.
+_retained: dict[str, list[int]] = {}
+_retained_lock = threading.Lock()
+
+
+def _footprint(obj) -> int:
+    """Approximate deep size in bytes of decoded JSON / feedparser data."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_footprint(k) + _footprint(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_footprint(v) for v in obj)
+    return size
+
+
+def _ingest(items: list[dict]) -> list[dict]:
+    """Project freshly decoded, tagged items and account for the bytes dropped."""
+    kept = [project(item) for item in items]
+    before = after = 0
+    for raw, lean in zip(items, kept):
+        before += _footprint(raw)
+        after += _footprint(lean)
+    if kept:
+        with _retained_lock:
+            entry = _retained.setdefault(kept[0].get("_src", "other"), [0, 0, 0])
+            entry[0] += len(kept)
+            entry[1] += before
+            entry[2] += after
+    return kept
+
+
+def _budget() -> budget.Ledger:
+    # A cassette must see the same request sizes it recorded, so cassette runs
+    # (and BUDGET=0) use every source's default size.
+    if not config.BUDGET or cassette.mode() is not None:
+        return budget.Ledger()
+    return budget.current()
+
+
+def _allocate(source: str, names, default: int | None) -> dict[str, int | None]:
+    """Request size per section/query name, minus the ones budget says to skip.
+
+    A ``default`` of None is for sources with no size parameter: the names
+    budget keeps map to None and only the skips apply.
+    """
+    book = _budget()
+    sizes: dict[str, int | None] = {}
+    for name in names:
+        key = f"{source}:{name}"
+        if book.skip(key):
+            log.info("%s skipped this run (nothing kept lately; see src.budget)", key)
+            continue
+        sizes[name] = default if default is None else book.size(key, default)
+        if sizes[name] != default:
+            log.info("%s budget %d -> %d items", key, default, sizes[name])
+    return sizes
+
+
+class Unit(NamedTuple):
+    """One independent request: a Guardian section, NYT section, Perigon query or feed.
+
+    ``fn`` takes the per-request timeout in seconds and the unit's watermark
+    (ISO UTC, or None for a full fetch) and returns raw items. Sources that can
+    filter by publish time only ask for items since the watermark; the others
+    ignore it. Any exception ``fn`` raises is logged against ``label`` and the
+    unit yields nothing. ``hints`` are the section hints its items carry.
+    ``pooled`` units have their items kept in the day's pool (src.pool); the
+    RSS cache unit is not, as its items already persist in src.fleet and the
+    pool's per-unit cap would cut a large fleet's cache down to one feed's worth.
+    For the same reason a unit that fetches several budget keys at once (the
+    coalesced Guardian unit) lists them as ``parts``: its items are pooled
+    under their own ``_unit`` key, and its watermark is the oldest of theirs.
+    """
+
+    key: str
+    label: str
+    fn: Callable[[float, str | None], list[dict]]
+    hints: tuple[str, ...] = ()
+    pooled: bool = True
+    parts: tuple[str, ...] = ()
+
+
+# --- Guardian -------------------------------------------------------------
+
+def _guardian_section(
+    key: str, section: str, hint: str, page_size: int, timeout: float, since: str | None
+) -> list[dict]:
+    params = {
+        "section": section,
+        "show-fields": "thumbnail,trailText,byline",
+        "order-by": "newest",
+        "page-size": page_size,
+        "api-key": key,
+    }
+    if since:
+        params["from-date"] = since
+    resp = client.get(GUARDIAN_URL, params=params, timeout=timeout, cache=True, source=f"guardian:{section}")
+    resp.raise_for_status()
+    results = resp.json().get("response", {}).get("results", [])
+    for r in results:
+        r["_src"] = "guardian"
+        r["_section_hint"] = hint
+        r["_unit"] = f"guardian:{section}"
+    return _ingest(results)
+
+
+def _guardian_coalesced(key: str, sizes: dict[str, int], timeout: float, since: str | None) -> list[dict]:
+    """The given sections through one OR'd ``section`` filter.
+
+    One page of all ``sizes`` together is demultiplexed on each result's
+    ``sectionId``. Sections that page left short of their ``sizes`` (it is
+    newest first across all of them, so quiet sections lose out) are then
+    fetched on their own, in parallel. ``timeout`` covers both rounds.
+    """
+    sections = {section: config.GUARDIAN_SECTIONS[section] for section in sizes}
+    params = {
+        "section": "|".join(sections),
+        "show-fields": "thumbnail,trailText,byline",
+        "order-by": "newest",
+        "page-size": min(50, sum(sizes.values())),  # the API's page-size ceiling is 50
+        "api-key": key,
+    }
+    if since:
+        params["from-date"] = since
+
+    by_section: dict[str, list[dict]] = {section: [] for section in sections}
+    give_up = time.monotonic() + timeout
+    began = time.monotonic()
+    resp = client.get(GUARDIAN_URL, params=params, timeout=timeout, cache=True, source="guardian")
+    resp.raise_for_status()
+    first = time.monotonic() - began
+    body = resp.json().get("response", {})
+    for r in body.get("results", []):
+        bucket = by_section.get(r.get("sectionId"))
+        if bucket is not None and len(bucket) < sizes[r["sectionId"]]:
+            r["_src"] = "guardian"
+            r["_section_hint"] = sections[r["sectionId"]]
+            r["_unit"] = f"guardian:{r['sectionId']}"
+            bucket.extend(_ingest([r]))
+    # One page held every match: short sections simply have no more items.
+    complete = body.get("pages", 1) <= 1
+    del resp, body
+
+    short = [] if complete else [section for section, n in sizes.items() if len(by_section[section]) < n]
+    remaining = give_up - time.monotonic()
+    if short and remaining > 0:
+        with ThreadPoolExecutor(max_workers=len(short), thread_name_prefix="guardian") as pool:
+            futures = {
+                section: pool.submit(_guardian_section, key, section, sections[section], sizes[section], remaining, since)
+                for section in short
+            }
+            for section, fut in futures.items():
+                try:
+                    # Newest first, so this is a superset of what the shared page gave it.
+                    by_section[section] = fut.result()
+                except Exception as exc:  # keep what the shared page had
+                    log.warning("Guardian section %s fallback failed: %s", section, exc)
+
+    elapsed = time.monotonic() - began
+    # Per-section mode runs its requests in parallel: about one request's
+    # latency (the shared page's) of wall time.
+    log.info(
+        "Guardian coalesced: %d request(s) instead of %d (%d short section(s) refetched), "
+        "%.1fs vs ~%.1fs per-section in parallel",
+        1 + len(short), len(sections), len(short), elapsed, first,
+    )
+
+    items: list[dict] = []
+    for section in sections:
+        items.extend(by_section[section])
+    return items
+
+
+def guardian_units(page_size: int = 10) -> list[Unit]:
+    """Guardian units: one coalesced unit, or one per section (none without a key).
+
+    With ``config.GUARDIAN_COALESCE`` all sections share one request (plus
+    per-section requests for any it leaves short); otherwise, the default,
+    each section is its own ``/search`` call. Each
+    section's ``page_size`` is adjusted (or the section skipped) by src.budget.
+    """
+    key = _api_key("GUARDIAN_API_KEY")
     if not key:
         log.warning("GUARDIAN_API_KEY not set; skipping Guardian")
         return []
-
-    items: list[dict] = []
-    for section, hint in config.GUARDIAN_SECTIONS.items():
-        try:
-            resp = requests.get(
-                GUARDIAN_URL,
-                params={
-                    "section": section,
-                    "show-fields": "thumbnail,trailText,byline",
-                    "order-by": "newest",
-                    "page-size": page_size,
-                    "api-key": key,
-                },
-                timeout=_TIMEOUT,
+    sizes = _allocate("guardian", config.GUARDIAN_SECTIONS, page_size)
+    if not sizes:
+        return []
+    if config.GUARDIAN_COALESCE and len(config.GUARDIAN_SECTIONS) > 1:
+        return [
+            Unit(
+                "guardian",
+                "Guardian sections " + "|".join(sizes),
+                lambda t, since: _guardian_coalesced(key, sizes, t, since),
+                tuple(config.GUARDIAN_SECTIONS[section] for section in sizes),
+                parts=tuple(f"guardian:{section}" for section in sizes),
             )
-            resp.raise_for_status()
-            results = resp.json().get("response", {}).get("results", [])
-            for r in results:
-                r["_src"] = "guardian"
-                r["_section_hint"] = hint
-            items.extend(results)
-        except Exception as exc:  # graceful per-section
-            log.warning("Guardian section %s failed: %s", section, exc)
-    return items
+        ]
+    return [
+        Unit(
+            f"guardian:{section}",
+            f"Guardian section {section}",
+            lambda t, since, s=section, n=n: _guardian_section(
+                key, s, config.GUARDIAN_SECTIONS[s], n, t, since
+            ),
+            (config.GUARDIAN_SECTIONS[section],),
+        )
+        for section, n in sizes.items()
+    ]
 
 
-def fetch_nyt() -> list[dict]:
-    """NYT Top Stories API across the configured sections."""
-    key = os.environ.get("NYT_API_KEY")
+def fetch_guardian(page_size: int = 10) -> list[dict]:
+    """Guardian Content API across the configured sections."""
+    return _run_sequential(guardian_units(page_size))
+
+
+# --- NYT ------------------------------------------------------------------
+
+def _nyt_section(key: str, section: str, hint: str, timeout: float) -> list[dict]:
+    timeout = _spend("nyt", timeout)
+    resp = client.get(
+        NYT_URL.format(section=section),
+        params={"api-key": key},
+        timeout=timeout,
+        cache=True,
+        source=f"nyt:{section}",
+    )
+    resp.raise_for_status()
+    results = resp.json().get("results", [])
+    for r in results:
+        r["_src"] = "nyt"
+        r["_section_hint"] = hint
+        r["_unit"] = f"nyt:{section}"
+    return _ingest(results)
+
+
+def nyt_units() -> list[Unit]:
+    """One unit per configured NYT Top Stories section (none when the key is missing).
+
+    Top Stories has no size parameter, so src.budget can only skip sections.
+    """
+    key = _api_key("NYT_API_KEY")
     if not key:
         log.warning("NYT_API_KEY not set; skipping NYT")
         return []
+    wanted = _allocate("nyt", config.NYT_SECTIONS, None)
+    return [
+        Unit(
+            f"nyt:{section}",
+            f"NYT section {section}",
+            lambda t, since, s=section, h=hint: _nyt_section(key, s, h, t),
+            (hint,),
+        )
+        for section, hint in config.NYT_SECTIONS.items()
+        if section in wanted
+    ]
 
-    items: list[dict] = []
-    for section, hint in config.NYT_SECTIONS.items():
-        try:
-            resp = requests.get(
-                NYT_URL.format(section=section),
-                params={"api-key": key},
-                timeout=_TIMEOUT,
-            )
-            resp.raise_for_status()
-            results = resp.json().get("results", [])
-            for r in results:
-                r["_src"] = "nyt"
-                r["_section_hint"] = hint
-            items.extend(results)
-        except Exception as exc:
-            log.warning("NYT section %s failed: %s", section, exc)
-    return items
+
+def fetch_nyt() -> list[dict]:
+    """NYT Top Stories API across the configured sections."""
+    return _run_sequential(nyt_units())
+
+
+# --- Perigon --------------------------------------------------------------
+
+def _perigon_query(key: str, query: dict, size: int, timeout: float, since: str | None) -> list[dict]:
+    params: dict = {
+        "apiKey": key,
+        "size": size,
+        "sortBy": "date",
+        "language": "en",
+        "showReprints": "false",
+    }
+    params.update(query.get("params", {}))
+    if since:
+        params["from"] = since
+    timeout = _spend("perigon", timeout)
+    resp = client.get(
+        PERIGON_URL, params=params, timeout=timeout, cache=True, source=f"perigon:{query.get('label')}"
+    )
+    resp.raise_for_status()
+    results = resp.json().get("articles", [])
+    for r in results:
+        r["_src"] = "perigon"
+        r["_section_hint"] = query["hint"]
+        r["_unit"] = f"perigon:{query.get('label')}"
+    return _ingest(results)
+
+
+def perigon_units(size: int = 10) -> list[Unit]:
+    """One unit per configured Perigon query (none when the key is missing).
+
+    Each query's ``size`` is adjusted (or the query skipped) by src.budget.
+    """
+    key = _api_key("PERIGON_API_KEY")
+    if not key:
+        log.warning("PERIGON_API_KEY not set; skipping Perigon")
+        return []
+    sizes = _allocate("perigon", [query.get("label") for query in config.PERIGON_QUERIES], size)
+    return [
+        Unit(
+            f"perigon:{query.get('label')}",
+            f"Perigon query {query.get('label')}",
+            lambda t, since, q=query, n=sizes[query.get("label")]: _perigon_query(key, q, n, t, since),
+            (query["hint"],),
+        )
+        for query in config.PERIGON_QUERIES
+        if query.get("label") in sizes
+    ]
 
 
 def fetch_perigon(size: int = 10) -> list[dict]:
@@ -95,79 +394,394 @@ def fetch_perigon(size: int = 10) -> list[dict]:
     warning and is skipped. Skipped entirely (with a warning) when the key is
     missing, exactly like the other keyed sources.
     """
-    key = os.environ.get("PERIGON_API_KEY")
-    if not key:
-        log.warning("PERIGON_API_KEY not set; skipping Perigon")
-        return []
+    return _run_sequential(perigon_units(size))
 
-    items: list[dict] = []
-    for query in config.PERIGON_QUERIES:
-        try:
-            params: dict = {
-                "apiKey": key,
-                "size": size,
-                "sortBy": "date",
-                "language": "en",
-                "showReprints": "false",
-            }
-            params.update(query.get("params", {}))
-            resp = requests.get(PERIGON_URL, params=params, timeout=_TIMEOUT)
-            resp.raise_for_status()
-            results = resp.json().get("articles", [])
-            for r in results:
-                r["_src"] = "perigon"
-                r["_section_hint"] = query["hint"]
-            items.extend(results)
-        except Exception as exc:  # graceful per-query
-            log.warning("Perigon query %s failed: %s", query.get("label"), exc)
+
+# --- RSS ------------------------------------------------------------------
+
+def _rss_feed(feed: dict, timeout: float) -> list[dict]:
+    resp = client.get(feed["url"], timeout=timeout, cache=True, source=f"rss:{feed['name']}")
+    resp.raise_for_status()
+    entries = rss.parse(resp.content) if config.RSS_FAST_PARSER else None
+    if entries is None:
+        # Malformed or unusual feed: feedparser is slow but forgiving.
+        parsed = feedparser.parse(resp.content)
+        if parsed.bozo and not parsed.entries:
+            log.warning("RSS feed %s looks dead (%s)", feed["name"], parsed.bozo_exception)
+            return []
+        entries = parsed.entries
+    for entry in entries:
+        entry["_src"] = "rss"
+        entry["_section_hint"] = fleet.hint(feed)
+        entry["_source_name"] = feed["name"]
+        entry["_unit"] = f"rss:{feed['name']}"
+    items = _ingest(entries)
+    fleet.current().observe(feed["url"], items)
     return items
 
 
-_RSS_HEADERS = {"User-Agent": "TheDaily/2.0 (+https://github.com/BenWassa/Hermes)"}
+def _rss_cached(feeds: list[dict]) -> list[dict]:
+    book = fleet.current()
+    return [item for feed in feeds for item in book.cached(feed["url"])]
+
+
+def rss_units() -> list[Unit]:
+    """One unit per RSS feed due a poll, plus one serving the rest from cache.
+
+    Every feed is due when the schedule is off or a cassette is recording or
+    replaying (both need the real requests).
+    """
+    feeds = fleet.feeds()
+    book = fleet.current()
+    poll_all = not config.FEED_SCHEDULE or cassette.mode() is not None
+    due = [feed for feed in feeds if poll_all or book.due(feed["url"])]
+    resting = [feed for feed in feeds if feed not in due]
+    if resting:
+        log.info("RSS fleet: polling %d of %d feeds; %d served from cache", len(due), len(feeds), len(resting))
+    units = [
+        Unit(
+            f"rss:{feed['name']}",
+            f"RSS feed {feed['name']}",
+            lambda t, since, f=feed: _rss_feed(f, t),
+            (fleet.hint(feed),),
+        )
+        for feed in due
+    ]
+    if resting:
+        units.append(
+            Unit(
+                "rss:cache",
+                f"RSS cache ({len(resting)} feeds not due)",
+                lambda t, since: _rss_cached(resting),
+                tuple(sorted({fleet.hint(feed) for feed in resting})),
+                pooled=False,
+            )
+        )
+    return units
+
+
+def _save_fleet() -> None:
+    # Replayed and recorded polls say nothing about the feeds' live cadence.
+    if cassette.mode() is None:
+        fleet.current().save()
 
 
 def fetch_toronto_rss() -> list[dict]:
     """Toronto local RSS feeds. A dead feed is skipped with a warning.
 
-    The feed bytes are fetched with ``requests`` (with a timeout) and handed to
-    feedparser, because ``feedparser.parse(url)`` has no timeout and can hang on
-    a slow or unreachable host.
+    The feed bytes are fetched through the shared client (with a timeout), not
+    by ``feedparser.parse(url)``, which has no timeout and can hang on a slow
+    or unreachable host. Well-formed RSS/Atom goes through the lean src.rss
+    reader; anything else falls back to feedparser. Feeds not yet due a poll
+    (src.fleet) come from their cached items.
+    """
+    items = _run_sequential(rss_units())
+    _save_fleet()
+    return items
+
+
+# --- Runners --------------------------------------------------------------
+
+def _run_unit(unit: Unit, timeout: float, since: str | None = None) -> tuple[list[dict], bool | None]:
+    """The unit's items and whether it succeeded (failures log and yield []).
+
+    None means the unit never went out (quota), which says nothing about the
+    source's health.
     """
+    try:
+        return unit.fn(timeout, since), True
+    except quota.QuotaExceeded as exc:
+        log.warning("%s skipped: %s", unit.label, exc)
+        return [], None
+    except Exception as exc:  # graceful per-unit
+        log.warning("%s failed: %s", unit.label, exc)
+        return [], False
+
+
+def _run_sequential(units: list[Unit]) -> list[dict]:
     items: list[dict] = []
-    for feed in config.TORONTO_RSS:
-        try:
-            resp = requests.get(feed["url"], headers=_RSS_HEADERS, timeout=_TIMEOUT)
-            resp.raise_for_status()
-            parsed = feedparser.parse(resp.content)
-            if parsed.bozo and not parsed.entries:
-                log.warning("RSS feed %s looks dead (%s)", feed["name"], parsed.bozo_exception)
-                continue
-            for entry in parsed.entries:
-                entry["_src"] = "rss"
-                entry["_section_hint"] = "toronto"
-                entry["_source_name"] = feed["name"]
-            items.extend(parsed.entries)
-        except Exception as exc:
-            log.warning("RSS feed %s failed: %s", feed["name"], exc)
+    for unit in units:
+        items.extend(_run_unit(unit, _TIMEOUT)[0])
     return items
 
 
-def fetch_all() -> list[dict]:
-    """All sources concatenated into one raw list."""
-    return fetch_guardian() + fetch_nyt() + fetch_perigon() + fetch_toronto_rss()
+def all_units() -> list[Unit]:
+    """Every configured unit, in source order (Guardian, NYT, Perigon, RSS)."""
+    return guardian_units() + nyt_units() + perigon_units() + rss_units()
+
+
+def _load_ledger() -> health.Ledger:
+    # A replayed run says nothing about the live sources: use a throwaway
+    # ledger so breakers neither skip units nor learn from canned latencies.
+    if cassette.mode() == "replay":
+        return health.Ledger()
+    return health.Ledger.load()
+
+
+def _load_pool() -> Pool:
+    # Incremental fetching only against the live network: a recording has to
+    # hold full responses to replay on its own, and a replay must not consume
+    # or overwrite the real watermarks.
+    if cassette.mode() is not None:
+        return Pool()
+    return Pool.load()
+
+
+def _since(day_pool: Pool, unit: Unit) -> str | None:
+    if not unit.parts:
+        return day_pool.since(unit.key)
+    marks = [day_pool.since(part) for part in unit.parts]
+    # The oldest part's watermark, so no part misses items; None if any has none.
+    return None if None in marks else min(marks)
+
+
+def _merge(day_pool: Pool, unit: Unit, items: list[dict]) -> tuple[list[dict], int]:
+    """``day_pool.merge`` for any unit: unpooled units pass straight through,
+    and a unit with ``parts`` merges each part's items under its own key."""
+    if not unit.pooled:
+        return items, 0
+    if not unit.parts:
+        return day_pool.merge(unit.key, items)
+    split: dict[str, list[dict]] = {part: [] for part in unit.parts}
+    for item in items:
+        split.setdefault(item.get("_unit") or unit.key, []).append(item)
+    merged: list[dict] = []
+    new = 0
+    for part, fresh in split.items():
+        kept, added = day_pool.merge(part, fresh)
+        merged.extend(kept)
+        new += added
+    return merged, new
+
+
+def _demand(units: list[Unit]) -> dict[str, int]:
+    """Candidates wanted per section hint before the rest of the fetch is moot.
+
+    ``curate._trim_input`` balances ``config.CURATE_MAX_INPUT`` stories
+    round-robin across the hints present, so each hint needs about an equal
+    share; ``config.FETCH_DEMAND_MARGIN`` leaves headroom for items that
+    normalize or dedupe will drop.
+    """
+    hints = {hint for unit in units for hint in unit.hints}
+    if not hints:
+        return {}
+    share = math.ceil(config.CURATE_MAX_INPUT / len(hints) * config.FETCH_DEMAND_MARGIN)
+    return {hint: share for hint in hints}
+
+
+def iter_fetch(
+    deadline: float = config.FETCH_DEADLINE,
+    workers: int = config.FETCH_WORKERS,
+) -> Iterator[dict]:
+    """Stream raw items from every source as each unit completes.
+
+    Units run on a pool of at most ``workers`` threads. The whole stage gets
+    ``deadline`` seconds of wall clock; each request's timeout is clipped to the
+    time left when it starts, and units still running when the deadline passes
+    are abandoned (logged, and charged a breaker failure) while everything that
+    did arrive is kept. Units still queued then are cancelled and logged as not
+    started; their sources were never asked, so their health is left alone.
+
+    Items are yielded in completion order, so a consumer (``normalize``) works
+    on the first unit's items while the rest are still on the wire, and each
+    raw item is dropped from here once it has been handed over.
+
+    Units whose circuit breaker is open (see src.health) are skipped; half-open
+    ones get a single probe with ``config.BREAKER_PROBE_TIMEOUT``. Each unit's
+    outcome and latency are written back to the health ledger, which in turn
+    sets every unit's timeout (p99-based, see ``Ledger.timeout``) and the start
+    order (highest expected yield of items per second first). The chosen
+    timeouts and the share of the deadline used are logged with the stage
+    summary.
+
+    With ``config.FETCH_DEMAND`` on, the stream stops early once every section
+    hint has the candidates trimming will use (``_demand``), or has no unit
+    left that could add to it (a hint only low-volume units supply can fall
+    short of its share and must not hold the fetch open): queued units are
+    cancelled, running ones abandoned, and both contribute only their pool.
+
+    Each unit fetches from its watermark and returns its merged pool for the
+    day (src.pool), so a unit that fails on a later attempt still contributes
+    what earlier attempts fetched.
+    """
+    units = all_units()
+    if not units:
+        return
+
+    ledger = _load_ledger()
+    day_pool = _load_pool()
+    with _retained_lock:
+        _retained.clear()
+    tripped = ledger.not_closed()
+    for key, state in sorted(tripped.items()):
+        log.warning("circuit %s: %s", state, ledger.describe(key))
+
+    runnable: list[int] = []
+    for i, unit in enumerate(units):
+        if tripped.get(unit.key) == health.OPEN:
+            log.info("%s skipped (circuit open)", unit.label)
+        else:
+            runnable.append(i)
+    runnable.sort(key=lambda i: -ledger.yield_rate(units[i].key))
+    timeouts = {units[i].key: ledger.timeout(units[i].key) for i in runnable}
+
+    start = time.monotonic()
+    cutoff = start + deadline
+
+    # Units whose request actually went out; only these can be charged a
+    # breaker failure for missing the deadline.
+    started: set[str] = set()
+
+    def run(unit: Unit) -> tuple[list[dict], bool | None, float]:
+        began = time.monotonic()
+        remaining = cutoff - began
+        if remaining <= 0:
+            return [], None, 0.0
+        started.add(unit.key)
+        timeout = min(timeouts[unit.key], remaining)
+        if tripped.get(unit.key) == health.HALF_OPEN:
+            timeout = min(timeout, config.BREAKER_PROBE_TIMEOUT)
+        items, ok = _run_unit(unit, timeout, _since(day_pool, unit))
+        return items, ok, time.monotonic() - began
+
+    demand = _demand([units[i] for i in runnable]) if config.FETCH_DEMAND else {}
+    have: Counter[str] = Counter()
+    answered: set[int] = set()
+    total = new_items = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(units))), thread_name_prefix="fetch")
+    try:
+        pending = {executor.submit(run, units[i]): i for i in runnable}
+        while pending:
+            remaining = cutoff - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i = pending.pop(fut)
+                items, ok, latency = fut.result()
+                merged, new = _merge(day_pool, units[i], items)
+                del items
+                if ok is not None:
+                    ledger.record(units[i].key, ok, latency, len(merged))
+                answered.add(i)
+                total += len(merged)
+                new_items += new
+                batch = deque(merged)
+                del merged
+                while batch:
+                    item = batch.popleft()
+                    have[item.get("_section_hint")] += 1
+                    yield item
+            # A hint no pending unit carries has all it will get this run.
+            open_hints = {h for i in pending.values() for h in units[i].hints}
+            if demand and pending and all(have[h] >= n or h not in open_hints for h, n in demand.items()):
+                cancelled = sum(fut.cancel() for fut in pending)
+                log.info(
+                    "demand met (%s); cancelled %d queued and abandoned %d running unit(s): %s",
+                    ", ".join(
+                        f"{h}={have[h]}/{n}" + ("" if have[h] >= n else " (all its units done)")
+                        for h, n in sorted(demand.items())
+                    ),
+                    cancelled, len(pending) - cancelled,
+                    ", ".join(units[i].key for i in sorted(pending.values())),
+                )
+                pending.clear()
+        queued = [i for fut, i in pending.items() if fut.cancel() or units[i].key not in started]
+        for i in sorted(queued):
+            log.info("%s not started before the %ss fetch deadline", units[i].label, deadline)
+        for i in sorted(set(pending.values()) - set(queued)):
+            log.warning("%s missed the %ss fetch deadline; skipped", units[i].label, deadline)
+            ledger.record(units[i].key, False, deadline)
+    finally:
+        # Don't block on stragglers: their requests time out on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
+        client.flush()
+        ledger.save()
+        quota.ledger().save()
+        _save_fleet()
+
+    # Skipped and late units still hand back what earlier attempts pooled.
+    for i, unit in enumerate(units):
+        if i not in answered and unit.pooled:
+            pooled = _merge(day_pool, unit, [])[0]
+            total += len(pooled)
+            yield from pooled
+    day_pool.save()
+
+    log.info(
+        "fetched %d items (%d new, %d from today's pool) from %d/%d units in %.1fs (%s)",
+        total, new_items, total - new_items, len(answered), len(units),
+        time.monotonic() - start, client.summary(),
+    )
+    log.info("quota used today: %s", quota.ledger().summary())
+    if timeouts:
+        log.info(
+            "timeouts: %s; used %.1fs of the %.0fs budget",
+            ", ".join(f"{key}={t:.1f}s" for key, t in timeouts.items()),
+            time.monotonic() - start, deadline,
+        )
+    received = client.bytes_by_source()
+    if received:
+        log.info(
+            "bytes received: %s",
+            ", ".join(f"{src}={n / 1024:.1f}KB" for src, n in sorted(received.items())),
+        )
+    with _retained_lock:
+        retained = {src: tuple(entry) for src, entry in _retained.items()}
+    if retained:
+        log.info(
+            "retained after projection: %s",
+            ", ".join(
+                f"{src} {n} items {before / 1024:.0f}KB -> {after / 1024:.0f}KB"
+                for src, (n, before, after) in sorted(retained.items())
+            ),
+        )
+
+
+def fetch_all(
+    deadline: float = config.FETCH_DEADLINE,
+    workers: int = config.FETCH_WORKERS,
+) -> list[dict]:
+    """All sources fetched concurrently into one raw list (see ``iter_fetch``)."""
+    return list(iter_fetch(deadline, workers))
+
+
+def add_cassette_args(parser) -> None:
+    """``--record``/``--replay`` options shared by the fetch and build entrypoints."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", type=Path, metavar="CASSETTE",
+                       help="save every HTTP exchange to a gzip cassette")
+    group.add_argument("--replay", type=Path, metavar="CASSETTE",
+                       help="answer every HTTP request from a cassette (no network)")
+
+
+def start_cassette(args) -> None:
+    if args.record:
+        cassette.record(args.record)
+    elif args.replay:
+        cassette.replay(args.replay)
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch and normalize all sources.")
+    add_cassette_args(parser)
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     from .normalize import normalize
 
-    raw = fetch_all()
-    stories = normalize(raw)
+    start_cassette(args)
+    t0 = time.perf_counter()
+    stories = normalize(iter_fetch())
+    elapsed = time.perf_counter() - t0
+    cassette.save()
 
     breakdown: dict[str, int] = {}
     for s in stories:
-        breakdown[s["source"]] = breakdown.get(s["source"], 0) + 1
+        breakdown[s.source] = breakdown.get(s.source, 0) + 1
 
-    print(f"Normalized stories: {len(stories)}")
+    print(f"Normalized stories: {len(stories)} (fetch + normalize {elapsed:.2f}s)")
     for src, n in sorted(breakdown.items()):
         print(f"  {src}: {n}")
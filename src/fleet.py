@@ -0,0 +1,178 @@
+"""RSS feed fleet: the feed list (config + OPML) and an adaptive poll schedule.
+
+Polling every feed on every build is fine for two Toronto feeds and wasteful
+for hundreds. For each feed this keeps a persisted record
+(``config.FLEET_PATH``) of when to poll it next and the items its last poll
+returned:
+
+- after a poll with new items, the next poll waits about ``FEED_POLL_FACTOR``
+  times the feed's typical gap between stories (the median gap between the
+  publish times of its newest items), clamped to
+  [``FEED_MIN_INTERVAL``, ``FEED_MAX_INTERVAL``];
+- a poll with nothing new (including a 304 from the HTTP cache) doubles the
+  interval, up to the maximum;
+- a feed with no usable publish times polls every ``FEED_DEFAULT_INTERVAL``.
+
+A build polls only the feeds that are due and reads the rest from their cached
+items (younger than ``FEED_CACHE_MAX_AGE``), so a quiet feed costs nothing.
+
+Feeds come from ``config.TORONTO_RSS`` plus every ``<outline xmlUrl=...>`` in
+the OPML file at ``config.FEEDS_OPML``, if present. A feed's items get the
+section hint in its ``hint`` key (``category`` attribute in OPML, e.g.
+``category="world"``), or ``toronto`` when it has none. ``python -m src.fleet``
+prints the schedule.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from . import config
+from .health import percentile
+from .pool import published
+from .store import load_json, save_json
+
+log = logging.getLogger("the-daily.fleet")
+
+# Section hints a feed may declare; anything else falls back to the default.
+HINTS = ("world", "business", "sports", "opinion", "toronto")
+DEFAULT_HINT = "toronto"
+
+
+def load_opml(path: Path) -> list[dict]:
+    """``{"name", "url"}`` for every feed outline in an OPML file, plus
+    ``"hint"`` when its ``category`` names a section hint."""
+    feeds = []
+    for outline in ET.parse(path).iter("outline"):
+        url = outline.get("xmlUrl")
+        if url:
+            feed = {"name": outline.get("title") or outline.get("text") or url, "url": url}
+            category = (outline.get("category") or "").strip("/ ").lower()
+            if category in HINTS:
+                feed["hint"] = category
+            elif category:
+                log.warning("feed %s: unknown category %r; using %s", feed["name"], category, DEFAULT_HINT)
+            feeds.append(feed)
+    return feeds
+
+
+def hint(feed: dict) -> str:
+    """The section hint for the feed's items."""
+    return feed.get("hint") or DEFAULT_HINT
+
+
+def feeds() -> list[dict]:
+    """Configured feeds followed by the OPML ones, first entry per URL wins."""
+    found = list(config.TORONTO_RSS)
+    opml = Path(config.FEEDS_OPML)
+    if opml.exists():
+        try:
+            found += load_opml(opml)
+        except ET.ParseError as exc:
+            log.warning("could not read %s: %s", opml, exc)
+    seen: set[str] = set()
+    return [f for f in found if not (f["url"] in seen or seen.add(f["url"]))]
+
+
+def _item_id(item: dict) -> str:
+    return str(item.get("id") or item.get("link") or item.get("title") or "")
+
+
+def _cadence(items: list[dict]) -> float | None:
+    """Median seconds between consecutive publish times, newest items first."""
+    stamps = sorted((when.timestamp() for when in map(published, items) if when), reverse=True)
+    stamps = stamps[: config.FEED_CADENCE_SAMPLE]
+    gaps = [a - b for a, b in zip(stamps, stamps[1:]) if a > b]
+    return percentile(gaps, 50)
+
+
+class Fleet:
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data: dict[str, dict] = data if data is not None else {}
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path(config.FLEET_PATH)) -> "Fleet":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is not None:
+            with self._lock:
+                save_json(self.path, self.data)
+
+    def due(self, url: str, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        with self._lock:
+            return self.data.get(url, {}).get("next_poll", 0) <= now
+
+    def observe(self, url: str, items: list[dict], now: float | None = None) -> int:
+        """Record a successful poll of ``url``; returns how many items were new.
+
+        Reschedules the feed and replaces its cached items with ``items``.
+        """
+        now = time.time() if now is None else now
+        gap = _cadence(items)
+        with self._lock:
+            entry = self.data.setdefault(url, {"interval": config.FEED_DEFAULT_INTERVAL, "items": []})
+            seen = {_item_id(item) for item in entry["items"]}
+            new = len({_item_id(item) for item in items} - seen)
+            if not new:
+                interval = entry["interval"] * 2
+            elif gap is not None:
+                interval = gap * config.FEED_POLL_FACTOR
+            else:
+                interval = config.FEED_DEFAULT_INTERVAL
+            entry["interval"] = min(config.FEED_MAX_INTERVAL, max(config.FEED_MIN_INTERVAL, interval))
+            entry["last_poll"] = now
+            entry["next_poll"] = now + entry["interval"]
+            entry["items"] = items[: config.FEED_CACHE_ITEMS]
+        return new
+
+    def cached(self, url: str, now: float | None = None) -> list[dict]:
+        """The feed's last polled items, minus those older than the cache age."""
+        cutoff = (time.time() if now is None else now) - config.FEED_CACHE_MAX_AGE
+        with self._lock:
+            items = list(self.data.get(url, {}).get("items", []))
+        fresh = []
+        for item in items:
+            when = published(item)
+            if when is None or when.timestamp() >= cutoff:
+                fresh.append(item)
+        return fresh
+
+    def describe(self, url: str, now: float | None = None) -> str:
+        now = time.time() if now is None else now
+        entry = self.data.get(url)
+        if not entry:
+            return "never polled"
+        wait = entry.get("next_poll", 0) - now
+        when = "due" if wait <= 0 else f"next in {wait / 60:.0f}m"
+        return f"every {entry['interval'] / 60:.0f}m, {when}, {len(entry['items'])} cached"
+
+
+_fleet: Fleet | None = None
+_fleet_lock = threading.Lock()
+
+
+def current() -> Fleet:
+    """The process-wide fleet schedule, loaded on first use."""
+    global _fleet
+    with _fleet_lock:
+        if _fleet is None:
+            _fleet = Fleet.load()
+        return _fleet
+
+
+if __name__ == "__main__":
+    fleet = current()
+    for feed in feeds():
+        print(f"{feed['name'][:40]:<40} {fleet.describe(feed['url'])}")
+    last = max((e.get("last_poll", 0) for e in fleet.data.values()), default=0)
+    if last:
+        print(f"last poll {dt.datetime.fromtimestamp(last):%Y-%m-%d %H:%M}")
@@ -0,0 +1,143 @@
+"""Per-unit health ledger and circuit breaker for the fetch stage.
+
+Every fetch unit (``guardian:world``, ``perigon:markets``, ``rss:CBC Toronto``
+...) gets a persisted record of recent successful latencies, its consecutive
+failure count, and when it last succeeded or failed. That record drives a
+circuit breaker:
+
+- closed     fewer than ``BREAKER_THRESHOLD`` consecutive failures; fetch normally.
+- open       at or past the threshold and still cooling down; skip the unit.
+- half-open  cooldown elapsed; send one probe with a short timeout. Success
+             closes the breaker, failure re-opens it with a doubled cooldown.
+
+So a dead feed or a Perigon outage costs its timeout once, not on every cron
+attempt, and recovers on its own once the source is back.
+
+The same latency history sets each unit's request timeout (``timeout``): its
+p99 times ``FETCH_TIMEOUT_FACTOR``, clamped between the floor and ceiling, so a
+fast API isn't given the 20 seconds a struggling feed host needs. With the
+item counts it also estimates each unit's yield (``yield_rate``), which orders
+the fetch so demand is met by the most productive units first.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+import time
+from pathlib import Path
+
+from . import config
+from .store import load_json, save_json
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+# Successful latencies kept per unit for the percentiles.
+_WINDOW = 50
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (``q`` in 0-100) of ``values``; None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _ago(ts: float | None, now: float) -> str:
+    if not ts:
+        return "never"
+    hours = (now - ts) / 3600
+    return f"{hours:.1f}h ago" if hours < 48 else dt.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+
+class Ledger:
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data: dict[str, dict] = data if data is not None else {}
+        self.path = path
+
+    @classmethod
+    def load(cls, path: Path = Path(config.HEALTH_PATH)) -> "Ledger":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is not None:
+            save_json(self.path, self.data)
+
+    def _entry(self, key: str) -> dict:
+        return self.data.setdefault(
+            key,
+            {"latencies": [], "items": [], "failures": 0, "last_success": None, "last_failure": None},
+        )
+
+    def _cooldown(self, entry: dict) -> float:
+        # Each failed probe doubles the wait, up to 16x the base cooldown.
+        extra = min(4, entry["failures"] - config.BREAKER_THRESHOLD)
+        return config.BREAKER_COOLDOWN * (2 ** max(0, extra))
+
+    def state(self, key: str, now: float | None = None) -> str:
+        entry = self.data.get(key)
+        if not entry or entry["failures"] < config.BREAKER_THRESHOLD:
+            return CLOSED
+        now = time.time() if now is None else now
+        if now - (entry["last_failure"] or 0) < self._cooldown(entry):
+            return OPEN
+        return HALF_OPEN
+
+    def record(self, key: str, ok: bool, latency: float, items: int = 0, now: float | None = None) -> None:
+        entry = self._entry(key)
+        now = time.time() if now is None else now
+        if ok:
+            entry["latencies"] = (entry["latencies"] + [round(latency, 3)])[-_WINDOW:]
+            entry["items"] = (entry.get("items", []) + [items])[-_WINDOW:]
+            entry["failures"] = 0
+            entry["last_success"] = now
+        else:
+            entry["failures"] += 1
+            entry["last_failure"] = now
+
+    def latency(self, key: str, q: float) -> float | None:
+        """The ``q``-th percentile of recent successful latencies for ``key``."""
+        return percentile(self.data.get(key, {}).get("latencies", []), q)
+
+    def timeout(self, key: str) -> float:
+        """Adaptive request timeout for ``key`` from its p99 latency.
+
+        Units with no successful history get the ceiling.
+        """
+        p99 = self.latency(key, 99)
+        if p99 is None:
+            return config.FETCH_TIMEOUT_CEILING
+        return min(config.FETCH_TIMEOUT_CEILING, max(config.FETCH_TIMEOUT_FLOOR, p99 * config.FETCH_TIMEOUT_FACTOR))
+
+    def expected(self, key: str) -> float:
+        """Typical (p50) latency for ``key``; half the ceiling when unknown."""
+        p50 = self.latency(key, 50)
+        return p50 if p50 is not None else config.FETCH_TIMEOUT_CEILING / 2
+
+    def yield_rate(self, key: str) -> float:
+        """Expected items per second for ``key`` (median items over p50 latency).
+
+        Units without history rank with a nominal 10 items, so new sources get
+        tried early rather than starved.
+        """
+        counts = self.data.get(key, {}).get("items", [])
+        items = percentile(counts, 50) if counts else 10
+        return items / max(0.05, self.expected(key))
+
+    def describe(self, key: str, now: float | None = None) -> str:
+        """One-line status for the log: failures, last success, p50/p95."""
+        entry = self.data.get(key, {})
+        now = time.time() if now is None else now
+        p50, p95 = self.latency(key, 50), self.latency(key, 95)
+        lat = f"p50={p50:.1f}s p95={p95:.1f}s" if p50 is not None else "no latency history"
+        return (
+            f"{key} ({entry.get('failures', 0)} consecutive failures, "
+            f"last ok {_ago(entry.get('last_success'), now)}, {lat})"
+        )
+
+    def not_closed(self, now: float | None = None) -> dict[str, str]:
+        """Units whose breaker is open or half-open, mapped to that state."""
+        states = {key: self.state(key, now) for key in self.data}
+        return {key: s for key, s in states.items() if s != CLOSED}
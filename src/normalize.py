@@ -1,49 +1,95 @@
 """Task 2 (part 2) - Normalize.
 
-Convert source-native items from fetch.py into one unified story schema:
+Convert source-native items from fetch.py into one unified story record,
+``src.story.Story``:
 
-    {
-      "title": str, "description": str, "source": str,
-      "section_hint": str,   # world|business|sports|opinion|toronto
-      "pub_date": str,       # ISO-ish
-      "image": str | None,
-      "link": str
-    }
+    title, description, source,
+    section_hint   # world|business|sports|opinion|toronto
+    pub_ts         # epoch seconds (None if the source date didn't parse)
+    image          # str | None
+    link
+    unit           # fetch budget key that supplied it (src.budget)
 
-Descriptions are stripped of HTML. Items missing a title or link are dropped.
+``Story.to_row`` is the compact row curation sends to the model.
+
+Titles and descriptions are stripped of HTML, entity-decoded, whitespace-
+collapsed and capped at ``config.CLEAN_MAX_CHARS``. Items missing a title or
+link are dropped, and exact duplicates (same canonical URL, or the same long
+headline) collapse to the richest copy before trimming ever sees them.
+
+``project`` is the other half of that contract: fetch calls it on every raw
+item as it is decoded, keeping only the fields the normalizers below (and
+src.pool's id/date lookup) read, so the rest of a response can be freed long
+before normalization.
 """
 
 from __future__ import annotations
 
+import html
+import logging
 import re
-from html import unescape
+from functools import lru_cache
+from typing import Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import config
+from .story import Story, epoch
+
+log = logging.getLogger("the-daily.normalize")
+
+# A tag, or a character reference exactly as html.unescape matches one. A
+# reference can't contain "<", so one left-to-right scan gives the same result
+# as stripping every tag first and unescaping after.
+_MARKUP_RE = re.compile(r"<[^>]+>|&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)")
+
+
+# Decodes one whole reference exactly as html.unescape would in place. Cached:
+# the same few references (&amp; &nbsp; &#8217;) make up nearly all of them.
+_unescape = lru_cache(maxsize=2048)(html.unescape)
 
-_TAG_RE = re.compile(r"<[^>]+>")
-_WS_RE = re.compile(r"\s+")
 
+def _markup(m: re.Match) -> str:
+    return " " if m.group(1) is None else _unescape(m.group(0))
 
-def _clean(text: str | None) -> str:
+
+def _clean(text: str | None, limit: int = config.CLEAN_MAX_CHARS) -> str:
+    """Plain text: tags become spaces, entities decode, whitespace collapses.
+
+    One regex pass for tags and entities (skipped when there are neither),
+    then split/join for the whitespace, instead of three regex passes.
+    Output longer than ``limit`` is cut at the last word boundary within it.
+    """
     if not text:
         return ""
-    text = _TAG_RE.sub(" ", text)
-    text = unescape(text)
-    return _WS_RE.sub(" ", text).strip()
+    if "<" in text or "&" in text:
+        text = _MARKUP_RE.sub(_markup, text)
+    return truncate(" ".join(text.split()), limit)
+
+
+def truncate(text: str, limit: int) -> str:
+    """``text`` cut to at most ``limit`` characters, at the last word boundary
+    within them when there is one."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[: cut if cut > 0 else limit]
 
 
-def _normalize_guardian(item: dict) -> dict:
+def _normalize_guardian(item: dict) -> Story:
     fields = item.get("fields", {}) or {}
-    return {
-        "title": _clean(item.get("webTitle")),
-        "description": _clean(fields.get("trailText")),
-        "source": "The Guardian",
-        "section_hint": item.get("_section_hint", "world"),
-        "pub_date": item.get("webPublicationDate", ""),
-        "image": fields.get("thumbnail") or None,
-        "link": item.get("webUrl", ""),
-    }
-
-
-def _normalize_nyt(item: dict) -> dict:
+    return Story(
+        title=_clean(item.get("webTitle")),
+        description=_clean(fields.get("trailText")),
+        source="The Guardian",
+        section_hint=item.get("_section_hint", "world"),
+        pub_ts=epoch(item.get("webPublicationDate")),
+        image=fields.get("thumbnail") or None,
+        link=item.get("webUrl", ""),
+        unit=item.get("_unit"),
+    )
+
+
+def _normalize_nyt(item: dict) -> Story:
     image = None
     multimedia = item.get("multimedia")
     if isinstance(multimedia, list) and multimedia:
@@ -54,36 +100,38 @@ def _normalize_nyt(item: dict) -> dict:
                 break
     elif isinstance(multimedia, dict):
         image = multimedia.get("url")
-    return {
-        "title": _clean(item.get("title")),
-        "description": _clean(item.get("abstract")),
-        "source": "The New York Times",
-        "section_hint": item.get("_section_hint", "world"),
-        "pub_date": item.get("published_date", ""),
-        "image": image,
-        "link": item.get("url", ""),
-    }
-
-
-def _normalize_perigon(item: dict) -> dict:
+    return Story(
+        title=_clean(item.get("title")),
+        description=_clean(item.get("abstract")),
+        source="The New York Times",
+        section_hint=item.get("_section_hint", "world"),
+        pub_ts=epoch(item.get("published_date")),
+        image=image,
+        link=item.get("url", ""),
+        unit=item.get("_unit"),
+    )
+
+
+def _normalize_perigon(item: dict) -> Story:
     source = item.get("source") or {}
     # Perigon's article source object carries a domain (e.g. "ft.com"); prefer a
     # friendly name when present, otherwise show the domain without "www.".
     name = source.get("name") or source.get("domain") or "Perigon"
     if name.startswith("www."):
         name = name[4:]
-    return {
-        "title": _clean(item.get("title")),
-        "description": _clean(item.get("description") or item.get("summary")),
-        "source": name,
-        "section_hint": item.get("_section_hint", "world"),
-        "pub_date": item.get("pubDate", "") or item.get("addDate", ""),
-        "image": item.get("imageUrl") or None,
-        "link": item.get("url", ""),
-    }
-
-
-def _normalize_rss(item: dict) -> dict:
+    return Story(
+        title=_clean(item.get("title")),
+        description=_clean(item.get("description") or item.get("summary")),
+        source=name,
+        section_hint=item.get("_section_hint", "world"),
+        pub_ts=epoch(item.get("pubDate") or item.get("addDate")),
+        image=item.get("imageUrl") or None,
+        link=item.get("url", ""),
+        unit=item.get("_unit"),
+    )
+
+
+def _normalize_rss(item: dict) -> Story:
     image = None
     # feedparser exposes media:thumbnail / media:content variously.
     thumbs = item.get("media_thumbnail") or item.get("media_content")
@@ -96,15 +144,85 @@ def _normalize_rss(item: dict) -> dict:
                 image = link.get("href")
                 break
     description = item.get("summary") or item.get("description")
-    return {
-        "title": _clean(item.get("title")),
-        "description": _clean(description),
-        "source": item.get("_source_name", "Toronto RSS"),
-        "section_hint": item.get("_section_hint", "toronto"),
-        "pub_date": item.get("published", "") or item.get("updated", ""),
-        "image": image or None,
-        "link": item.get("link", ""),
-    }
+    return Story(
+        title=_clean(item.get("title")),
+        description=_clean(description),
+        source=item.get("_source_name", "Toronto RSS"),
+        section_hint=item.get("_section_hint", "toronto"),
+        pub_ts=epoch(item.get("published") or item.get("updated")),
+        image=image or None,
+        link=item.get("link", ""),
+        unit=item.get("_unit"),
+    )
+
+
+# --- Projection at ingestion ----------------------------------------------
+# Helper keys set by fetch, plus the id and publish-time keys src.pool reads.
+_HELPER_KEYS = ("_src", "_section_hint", "_source_name", "_unit")
+
+
+def _keep(item: dict, keys: tuple[str, ...]) -> dict:
+    return {k: item[k] for k in keys + _HELPER_KEYS if k in item}
+
+
+def _project_guardian(item: dict) -> dict:
+    out = _keep(item, ("id", "webTitle", "webUrl", "webPublicationDate"))
+    fields = item.get("fields") or {}
+    out["fields"] = {k: fields[k] for k in ("trailText", "thumbnail") if fields.get(k)}
+    return out
+
+
+def _project_nyt(item: dict) -> dict:
+    out = _keep(item, ("uri", "title", "abstract", "url", "published_date"))
+    multimedia = item.get("multimedia")
+    if isinstance(multimedia, dict):
+        multimedia = [multimedia]
+    if isinstance(multimedia, list):
+        first = next((m for m in multimedia if isinstance(m, dict) and m.get("url")), None)
+        if first:
+            out["multimedia"] = [{"url": first["url"]}]
+    return out
+
+
+def _project_perigon(item: dict) -> dict:
+    out = _keep(item, ("articleId", "title", "description", "summary", "url", "pubDate", "addDate", "imageUrl"))
+    source = item.get("source") or {}
+    out["source"] = {k: source[k] for k in ("name", "domain") if source.get(k)}
+    return out
+
+
+def _project_rss(item: dict) -> dict:
+    out = _keep(item, ("id", "title", "link", "summary", "description", "published", "updated"))
+    for key in ("media_thumbnail", "media_content"):
+        media = item.get(key)
+        if isinstance(media, list) and media:
+            out[key] = [{"url": media[0].get("url")}]
+    links = [
+        {"type": link["type"], "href": link.get("href")}
+        for link in item.get("links", []) or []
+        if isinstance(link, dict) and link.get("type", "").startswith("image")
+    ]
+    if links:
+        out["links"] = links[:1]
+    return out
+
+
+_PROJECT = {
+    "guardian": _project_guardian,
+    "nyt": _project_nyt,
+    "perigon": _project_perigon,
+    "rss": _project_rss,
+}
+
+
+def project(item: dict) -> dict:
+    """A plain dict holding only the fields ``normalize`` reads from ``item``.
+
+    Normalizing the projection gives the same story as normalizing the raw
+    item. Items with an unknown ``_src`` pass through unchanged.
+    """
+    fn = _PROJECT.get(item.get("_src"))
+    return fn(item) if fn is not None else item
 
 
 _DISPATCH = {
@@ -115,14 +233,82 @@ _DISPATCH = {
 }
 
 
-def normalize(raw_items: list[dict]) -> list[dict]:
-    """Unify a mixed list of source-native items; drop items missing title/link."""
-    out: list[dict] = []
+# --- Exact duplicates -----------------------------------------------------
+# Query parameters that only track the click, never select the page.
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "mc_cid", "mc_eid", "cmp", "cmpid", "smid", "smtyp",
+    "ref", "ref_src", "partner", "s_cid", "ocid", "ncid",
+}
+_TRACKING_PREFIXES = ("utm_", "at_")
+
+# Headlines shorter than this many words ("Letters", "Morning briefing") are
+# too generic to call two stories the same.
+_TITLE_KEY_MIN_WORDS = 6
+_TITLE_KEY_RE = re.compile(r"\W+")
+
+
+def canonical_url(url: str) -> str:
+    """``url`` reduced to what identifies the page.
+
+    https, lower-case host without ``www.``, no fragment, no trailing slash,
+    tracking parameters (``utm_*`` and friends) dropped and the rest sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    )
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    return urlunsplit((scheme, host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def _dedupe_keys(story: Story) -> list[str]:
+    keys = ["url:" + canonical_url(story.link)]
+    words = _TITLE_KEY_RE.sub(" ", story.title.casefold()).split()
+    if len(words) >= _TITLE_KEY_MIN_WORDS:
+        keys.append("title:" + " ".join(words))
+    return keys
+
+
+def _richness(story: Story) -> tuple[bool, int]:
+    return story.image is not None, len(story.description)
+
+
+def normalize(raw_items: Iterable[dict]) -> list[Story]:
+    """Unify a mixed stream of source-native items; drop items missing title/link.
+
+    Consumes ``raw_items`` lazily, so it can run on ``fetch.iter_fetch()`` while
+    the fetch is still in flight and each raw item can be freed once converted.
+
+    Stories sharing a canonical URL or a long enough headline are collapsed
+    through a hash index: the first one keeps its place in the output, holding
+    whichever copy is richest (has an image, then longest description).
+    """
+    out: list[Story] = []
+    index: dict[str, int] = {}
+    collapsed = 0
     for item in raw_items:
         fn = _DISPATCH.get(item.get("_src"))
         if fn is None:
             continue
         story = fn(item)
-        if story["title"] and story["link"]:
+        if not (story.title and story.link):
+            continue
+        keys = _dedupe_keys(story)
+        at = next((index[k] for k in keys if k in index), None)
+        if at is None:
+            at = len(out)
             out.append(story)
+        else:
+            collapsed += 1
+            if _richness(story) > _richness(out[at]):
+                out[at] = story
+        for k in keys:
+            index.setdefault(k, at)
+    if collapsed:
+        log.info("collapsed %d exact duplicate(s) into %d stories", collapsed, len(out))
     return out
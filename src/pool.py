@@ -0,0 +1,118 @@
+"""Per-unit high-water marks and the day's pool of already-fetched items.
+
+The morning's cron attempts (and local rebuilds) all want the same edition, so
+after the first attempt a unit only needs what was published since. For each
+fetch unit this keeps the newest publish time seen (the watermark) and the raw
+items fetched earlier the same Toronto day. Fetchers that can filter server-side
+(Guardian ``from-date``, Perigon ``from``) ask only for items newer than the
+watermark; everything fresh is then merged into the pool by item id, newest
+first, and the merged pool is what the unit returns. A new day starts clean.
+
+Pooled items are held as JSON text plus their id and publish time, never as
+the fetched objects themselves, so merging doesn't keep raw responses (bulky
+feedparser entries especially) alive once the caller has normalized them.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import hashlib
+import json
+import threading
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from . import config
+from .store import load_json, save_json
+
+# Where each source keeps its publish time and a stable id, in preference order.
+_DATE_KEYS = ("webPublicationDate", "published_date", "pubDate", "published", "updated", "addDate")
+_ID_KEYS = ("id", "uri", "articleId", "webUrl", "url", "link")
+
+# Bumped when the on-disk layout changes; an older file is treated as empty.
+_FORMAT = 2
+
+
+def _today() -> str:
+    return dt.datetime.now(ZoneInfo(config.TIMEZONE)).date().isoformat()
+
+
+def published(item: dict) -> dt.datetime | None:
+    """The item's publish time as an aware UTC datetime, or None if unparseable."""
+    for key in _DATE_KEYS:
+        value = item.get(key)
+        if not value or not isinstance(value, str):
+            continue
+        try:
+            when = dt.datetime.fromisoformat(value)
+        except ValueError:
+            try:
+                when = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                continue
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=dt.timezone.utc)
+        return when.astimezone(dt.timezone.utc)
+    return None
+
+
+def _record(item: dict) -> dict:
+    raw = json.dumps(item, ensure_ascii=False, default=str)
+    item_id = next((str(item[k]) for k in _ID_KEYS if item.get(k)), None)
+    when = published(item)
+    return {
+        "id": item_id or hashlib.sha1(raw.encode("utf-8")).hexdigest(),
+        "ts": when.timestamp() if when else None,
+        "raw": raw,
+    }
+
+
+def _iso(when: dt.datetime) -> str:
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Pool:
+    def __init__(self, data: dict | None = None, path: Path | None = None, day: str | None = None):
+        self.day = day or _today()
+        data = data or {}
+        current = data.get("day") == self.day and data.get("format") == _FORMAT
+        self.units: dict[str, dict] = data.get("units", {}) if current else {}
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path(config.POOL_PATH)) -> "Pool":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is not None:
+            with self._lock:
+                save_json(self.path, {"format": _FORMAT, "day": self.day, "units": self.units})
+
+    def since(self, key: str) -> str | None:
+        """ISO UTC watermark for ``key`` (None before its first fetch today)."""
+        with self._lock:
+            return self.units.get(key, {}).get("watermark")
+
+    def merge(self, key: str, fresh: list[dict]) -> tuple[list[dict], int]:
+        """Fold ``fresh`` into the unit's pool; returns (merged items, new count).
+
+        A fresh copy of an item replaces the pooled one. The merged list is
+        newest first and capped at ``config.POOL_MAX_ITEMS``; fresh items come
+        back as the same objects, pooled ones are decoded from their JSON.
+        """
+        records = [_record(item) for item in fresh]
+        by_id = {rec["id"]: item for rec, item in zip(records, fresh)}
+        with self._lock:
+            entry = self.units.setdefault(key, {"watermark": None, "items": []})
+            merged = {rec["id"]: rec for rec in entry["items"]}
+            new = len({rec["id"] for rec in records} - merged.keys())
+            merged.update((rec["id"], rec) for rec in records)
+            kept = sorted(merged.values(), key=lambda rec: rec["ts"] or 0.0, reverse=True)
+            kept = kept[: config.POOL_MAX_ITEMS]
+            entry["items"] = kept
+            newest = max((rec["ts"] for rec in kept if rec["ts"]), default=None)
+            if newest is not None:
+                entry["watermark"] = _iso(dt.datetime.fromtimestamp(newest, dt.timezone.utc))
+        return [by_id.get(rec["id"]) or json.loads(rec["raw"]) for rec in kept], new
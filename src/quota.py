@@ -0,0 +1,169 @@
+"""Per-provider API quota ledger and token-bucket rate limiting.
+
+NYT, Perigon and the Gemini free tier cap requests per minute and per day.
+Manual reruns plus the morning's cron attempts can run into those caps, and a
+429 costs a full retry ladder before we learn anything. So every keyed call
+first goes through ``acquire``:
+
+- a token bucket per provider spaces calls to its per-minute limit (waiting a
+  bounded time for a token rather than earning a 429);
+- a persisted daily ledger (``config.QUOTA_PATH``) counts requests and tokens
+  per provider per UTC day, and refuses a call that would exceed the daily
+  limit, so the caller can skip it or downgrade (curate switches models).
+
+Providers are named ``nyt``, ``perigon`` or ``gemini:<model>`` (each Gemini
+model has its own free-tier quota); limits are looked up by the part before
+the colon in ``config.QUOTAS``.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import threading
+import time
+from pathlib import Path
+
+from . import config
+from .store import load_json, save_json
+
+log = logging.getLogger("the-daily.quota")
+
+# Days of history kept in the ledger file.
+_KEEP_DAYS = 7
+
+
+class QuotaExceeded(Exception):
+    """The provider's daily quota is (predicted to be) used up; the call was not made."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, wait: float) -> bool:
+        """Take one token, sleeping up to ``wait`` seconds for it; False if none came."""
+        give_up = time.monotonic() + wait
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                needed = (1 - self.tokens) / self.rate
+            if time.monotonic() + needed > give_up:
+                return False
+            time.sleep(needed)
+
+
+def _today() -> str:
+    return dt.datetime.now(dt.timezone.utc).date().isoformat()
+
+
+def _limits(provider: str) -> dict:
+    return config.QUOTAS.get(provider.split(":", 1)[0], {})
+
+
+class Ledger:
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data: dict[str, dict] = data if data is not None else {}
+        self.path = path
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path(config.QUOTA_PATH)) -> "Ledger":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            for day in sorted(self.data)[:-_KEEP_DAYS]:
+                del self.data[day]
+            save_json(self.path, self.data)
+
+    def _usage(self, provider: str) -> dict:
+        return self.data.setdefault(_today(), {}).setdefault(provider, {"requests": 0, "tokens": 0})
+
+    def _bucket(self, provider: str) -> TokenBucket | None:
+        per_minute = _limits(provider).get("per_minute")
+        if not per_minute:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                bucket = self._buckets[provider] = TokenBucket(per_minute / 60, per_minute)
+            return bucket
+
+    def remaining(self, provider: str) -> int | None:
+        """Requests left today, or None for a provider without a daily limit."""
+        per_day = _limits(provider).get("per_day")
+        if not per_day:
+            return None
+        with self._lock:
+            return max(0, per_day - self._usage(provider)["requests"])
+
+    def allow(self, provider: str) -> bool:
+        """Whether a call now would stay inside today's quota."""
+        left = self.remaining(provider)
+        return left is None or left > 0
+
+    def acquire(self, provider: str, wait: float) -> None:
+        """Reserve one request, pacing to the per-minute limit.
+
+        Raises QuotaExceeded when today's quota is spent, or when no rate
+        token frees up within ``wait`` seconds.
+        """
+        if not self.allow(provider):
+            raise QuotaExceeded(f"{provider} daily quota used up ({_limits(provider)['per_day']}/day)")
+        bucket = self._bucket(provider)
+        if bucket is not None and not bucket.acquire(wait):
+            raise QuotaExceeded(f"{provider} rate limit: no slot within {wait:.0f}s")
+        with self._lock:
+            self._usage(provider)["requests"] += 1
+
+    def record_tokens(self, provider: str, tokens: int) -> None:
+        with self._lock:
+            self._usage(provider)["tokens"] += int(tokens or 0)
+
+    def exhaust(self, provider: str) -> None:
+        """Mark today's quota as spent after the provider kept refusing us."""
+        per_day = _limits(provider).get("per_day")
+        if per_day:
+            with self._lock:
+                self._usage(provider)["requests"] = max(self._usage(provider)["requests"], per_day)
+            log.warning("%s marked exhausted for today", provider)
+
+    def summary(self) -> str:
+        with self._lock:
+            today = self.data.get(_today(), {})
+            return ", ".join(
+                f"{p}={u['requests']}" + (f"/{_limits(p)['per_day']}" if _limits(p).get("per_day") else "")
+                + (f" ({u['tokens']} tok)" if u["tokens"] else "")
+                for p, u in sorted(today.items())
+            ) or "none"
+
+
+_ledger: Ledger | None = None
+_ledger_lock = threading.Lock()
+
+
+def ledger() -> Ledger:
+    """The process-wide ledger, loaded on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger.load()
+        return _ledger
@@ -0,0 +1,41 @@
+"""Small JSON persistence helpers for run-to-run state under data/.
+
+Writes go to a temp file and are renamed into place, so a run killed mid-write
+never leaves a half-written file behind; a missing or unreadable file loads as
+the caller's default rather than failing the build.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+log = logging.getLogger("the-daily.store")
+
+
+def load_json(path: Path, default):
+    """Parsed JSON at ``path``, or ``default`` when missing or corrupt."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as exc:
+        log.warning("ignoring unreadable %s: %s", path, exc)
+        return default
+
+
+def save_json(path: Path, data) -> None:
+    """Atomically write ``data`` as JSON to ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            # default=str keeps odd leaf values (feedparser extras) from failing the save.
+            json.dump(data, fh, ensure_ascii=False, separators=(",", ":"), default=str)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,185 @@
+"""The normalized story record carried from normalize through trimming into curate.
+
+A slots dataclass instead of a per-story dict: no per-instance ``__dict__``,
+``source`` and ``section_hint`` interned (a few dozen distinct values shared by
+every story), and the publish time held as epoch seconds rather than each
+source's own date string. ``to_row`` renders the compact row curation sends to
+the model (under ``ROW_COLUMNS``; no image or link). ``to_dict`` is the full
+record as JSON, with the date as ISO 8601 UTC, which the fixtures use.
+
+``epoch`` turns every source's date format into those seconds: Guardian
+``...Z`` and NYT/Perigon ISO offsets through the C ``fromisoformat``, RSS
+RFC 822 through one regex and integer arithmetic (about twice as fast as
+``email.utils``); anything else falls back to the general parsers, cached
+because feeds repeat the same few odd strings.
+
+``python -m src.bench stories`` compares it with plain dicts at 10k and 100k
+stories.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import re
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from . import config
+
+# Sat, 17 Oct 2026 10:00:00 -0400 / GMT / EDT (weekday and seconds optional)
+_RFC_RE = re.compile(
+    r"(?:[A-Za-z]{3}, )?(\d{1,2}) ([A-Za-z]{3}) (\d{4}) (\d\d):(\d\d)(?::(\d\d))? "
+    r"(?:(GMT|UTC|UT|Z|[ECMP][SD]T)|([+-])(\d\d)(\d\d))$"
+)
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+# Month lengths in a common year (Feb 29 takes the slow path).
+_MONTH_DAYS = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# The North American zone names RFC 822 allows, as UTC offsets in hours.
+_ZONES = {"GMT": 0, "UTC": 0, "UT": 0, "Z": 0, "EST": -5, "EDT": -4, "CST": -6, "CDT": -5,
+          "MST": -7, "MDT": -6, "PST": -8, "PDT": -7}
+
+
+def _days(y: int, m: int, d: int) -> int:
+    """Days from 1970-01-01 to a proleptic Gregorian date (Hinnant's algorithm)."""
+    y -= m <= 2
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + d - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+
+@lru_cache(maxsize=1024)
+def _epoch_slow(value: str) -> int | None:
+    try:
+        when = dt.datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return int(when.timestamp())
+
+
+def epoch(value: str | None) -> int | None:
+    """Epoch seconds for an ISO 8601 or RFC 822 date string; None if unparseable.
+
+    Naive times are taken as UTC.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    if value[4:5] == "-":
+        try:
+            when = dt.datetime.fromisoformat(value)
+        except ValueError:
+            return _epoch_slow(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=dt.timezone.utc)
+        return int(when.timestamp())
+    m = _RFC_RE.match(value)
+    if m is not None:
+        d, mon, y, h, mi, s, zone, sign, oh, om = m.groups()
+        month = _MONTHS.get(mon.lower())
+        day, hour, minute, second = int(d), int(h), int(mi), int(s or 0)
+        # Out-of-range fields (Feb 30, a leap second) are left to the slow parser.
+        if month and day <= _MONTH_DAYS[month] and hour < 24 and minute < 60 and second < 60:
+            if zone is not None:
+                offset = _ZONES[zone] * 3600
+            else:
+                offset = (int(oh) * 3600 + int(om) * 60) * (-1 if sign == "-" else 1)
+            return _days(int(y), month, day) * 86400 + hour * 3600 + minute * 60 + second - offset
+    return _epoch_slow(value)
+
+
+def iso(ts: int | None) -> str:
+    """``2026-10-17T10:00:00Z`` for epoch seconds; "" for None."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts is not None else ""
+
+
+def display_time(ts: int | None, today: dt.date) -> str | None:
+    """The edition's "time" string for a publish time, in Toronto time.
+
+    "6:45 AM" for today, "Yesterday", the weekday within the past week, else
+    "Oct 3". None when the time is unknown.
+    """
+    if ts is None:
+        return None
+    when = dt.datetime.fromtimestamp(ts, ZoneInfo(config.TIMEZONE))
+    days = (today - when.date()).days
+    if days <= 0:
+        return when.strftime("%I:%M %p").lstrip("0")
+    if days == 1:
+        return "Yesterday"
+    if days < 7:
+        return when.strftime("%A")
+    return f"{when.strftime('%b')} {when.day}"
+
+
+# Columns of ``Story.to_row``, sent once as the header row of the curate prompt.
+ROW_COLUMNS = ["id", "section_hint", "source", "published", "title", "description", "also_reported_by"]
+
+
+@dataclass(slots=True)
+class Story:
+    title: str
+    description: str
+    source: str
+    section_hint: str
+    pub_ts: int | None
+    image: str | None
+    link: str
+    # Fetch budget key that supplied the story (src.budget); never sent to the model.
+    unit: str | None = None
+    # Other outlets carrying the same story (src.cluster), as "also_reported_by".
+    also: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        self.source = sys.intern(self.source)
+        self.section_hint = sys.intern(self.section_hint)
+
+    @property
+    def pub_date(self) -> str:
+        return iso(self.pub_ts)
+
+    def to_row(self, story_id: str) -> list:
+        """The story as the model sees it: text fields only, under ``ROW_COLUMNS``,
+        with the publish time as UTC ``MM-DD HH:MM``."""
+        published = time.strftime("%m-%d %H:%M", time.gmtime(self.pub_ts)) if self.pub_ts is not None else ""
+        return [story_id, self.section_hint, self.source, published, self.title, self.description,
+                ", ".join(self.also)]
+
+    def to_dict(self) -> dict:
+        """The full record as JSON (fixtures, bench), without bookkeeping fields."""
+        data = {
+            "title": self.title,
+            "description": self.description,
+            "source": self.source,
+            "section_hint": self.section_hint,
+            "pub_date": iso(self.pub_ts),
+            "image": self.image,
+            "link": self.link,
+        }
+        if self.also:
+            data["also_reported_by"] = list(self.also)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Story":
+        """Inverse of ``to_dict``; accepts the fixtures' dict stories."""
+        return cls(
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            source=data.get("source", ""),
+            section_hint=data.get("section_hint", "world"),
+            pub_ts=epoch(data.get("pub_date")),
+            image=data.get("image"),
+            link=data.get("link", ""),
+            unit=data.get("_unit"),
+            also=tuple(data.get("also_reported_by", ())),
+        )
@@ -0,0 +1,71 @@
+"""Prompt token estimates for sizing the curate input.
+
+A story count says little about prompt size: a day of long Perigon
+descriptions can weigh several times a day of short RSS blurbs. Curation
+sizes its input in tokens, and this module estimates them locally. Each
+estimate is the text length divided by a characters-per-token ratio for the
+model.
+
+The ratio starts at ``config.TOKENS_CHARS_PER_TOKEN``. It is calibrated
+against the counts Gemini reports: ``prompt_token_count`` from every curate
+call's usage metadata, and, with ``CURATE_COUNT_TOKENS=1``, a ``count_tokens``
+call made before sending. Each observation moves a per-model moving average
+(``TOKENS_SMOOTHING``), persisted in ``config.TOKENS_PATH``.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from pathlib import Path
+
+from . import config
+from .store import load_json, save_json
+
+
+class Calibration:
+    def __init__(self, data: dict | None = None, path: Path | None = None):
+        self.data: dict[str, dict] = data if data is not None else {}
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = Path(config.TOKENS_PATH)) -> "Calibration":
+        return cls(load_json(path, {}), path)
+
+    def save(self) -> None:
+        if self.path is not None:
+            with self._lock:
+                save_json(self.path, self.data)
+
+    def ratio(self, model: str = config.CURATE_MODEL) -> float:
+        """Characters per token for ``model``."""
+        with self._lock:
+            return self.data.get(model, {}).get("chars_per_token", config.TOKENS_CHARS_PER_TOKEN)
+
+    def estimate(self, text: str, model: str = config.CURATE_MODEL) -> int:
+        return math.ceil(len(text) / self.ratio(model))
+
+    def observe(self, model: str, chars: int, actual: int) -> None:
+        """Fold one measured count (``actual`` tokens for ``chars`` characters) in."""
+        if chars <= 0 or actual <= 0:
+            return
+        measured = chars / actual
+        with self._lock:
+            entry = self.data.setdefault(model, {"chars_per_token": measured, "runs": 0})
+            if entry["runs"]:
+                entry["chars_per_token"] += config.TOKENS_SMOOTHING * (measured - entry["chars_per_token"])
+            entry["runs"] += 1
+
+
+_calibration: Calibration | None = None
+_calibration_lock = threading.Lock()
+
+
+def current() -> Calibration:
+    """The process-wide calibration, loaded on first use."""
+    global _calibration
+    with _calibration_lock:
+        if _calibration is None:
+            _calibration = Calibration.load()
+        return _calibration
@@ -8,9 +8,7 @@ from __future__ import annotations
 
 import datetime as dt
 
-import requests
-
-from . import config
+from . import client, config
 
 OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
 
@@ -37,7 +35,7 @@ def get_weather() -> dict:
         "wind_speed_unit": "kmh",
         "forecast_days": 7,
     }
-    resp = requests.get(OPEN_METEO_URL, params=params, timeout=20)
+    resp = client.get(OPEN_METEO_URL, params=params, timeout=20, source="weather")
     resp.raise_for_status()
     data = resp.json()
 